@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import django
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecommerce.settings")
+
+# Benchmarks run against a throwaway database so that they never touch the development data.
+_database_directory = tempfile.TemporaryDirectory()
+os.environ["DATABASE_NAME"] = str(Path(_database_directory.name) / "benchmark.sqlite3")
+django.setup()
+
+from django.core.management import call_command
+
+from _benchmarks._admission import AdmissionBenchmark
+from _benchmarks._bulk import BulkBenchmark
+from _benchmarks._database import DatabaseBenchmark
+from _benchmarks._inventory import InventoryBenchmark
+from _benchmarks._promotions import PromotionsBenchmark
+from _benchmarks._recommendations import RecommendationsBenchmark
+from _benchmarks._workers import WorkersBenchmark
+
+BENCHMARKS = {
+    "database": DatabaseBenchmark,
+    "inventory": InventoryBenchmark,
+    "admission": AdmissionBenchmark,
+    "recommendations": RecommendationsBenchmark,
+    "promotions": PromotionsBenchmark,
+    "workers": WorkersBenchmark,
+    "bulk": BulkBenchmark,
+}
+
+
+if __name__ == "__main__":
+    call_command("migrate", verbosity=0)
+
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f"Running the {name} benchmark...")
+        BENCHMARKS[name].run()
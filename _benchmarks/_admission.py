@@ -0,0 +1,91 @@
+import logging
+import statistics
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from profiles.models import UserProfile
+
+
+class AdmissionBenchmark:
+    """Class load testing the checkout with and without admission control."""
+    @staticmethod
+    def _shopper(user: UserProfile, deadline: float, results: dict[str, list], lock: threading.Lock) -> None:
+        """Hammers the checkout until the deadline, recording the status and latency of every request.
+
+        Args:
+            user: The user checking out.
+            deadline: The `time.perf_counter` value at which the shopper stops.
+            results: Shared lists of latencies per status code.
+            lock: The lock guarding `results`.
+        """
+        client = Client()
+        client.force_login(user)
+        url = reverse("shopping:cart-confirm")
+        latencies: dict[int, list[float]] = {}
+        while time.perf_counter() < deadline:
+            started_at = time.perf_counter()
+            status = client.post(url).status_code
+            latencies.setdefault(status, []).append(time.perf_counter() - started_at)
+        connection.close()
+        with lock:
+            for status, values in latencies.items():
+                results.setdefault(status, []).extend(values)
+
+    @staticmethod
+    def _measure(users: list[UserProfile], duration: float) -> dict[int, list[float]]:
+        """Runs one shopper thread per user for the given duration.
+
+        Args:
+            users: The users checking out concurrently.
+            duration: The measurement duration in seconds.
+
+        Returns:
+            The latencies of the requests per status code.
+        """
+        cache.clear()
+        results: dict[int, list[float]] = {}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(target=AdmissionBenchmark._shopper, args=(user, deadline, results, lock))
+            for user in users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    @staticmethod
+    def run(shoppers: int = 32, duration: float = 5.0) -> None:
+        """Static method that prints the checkout throughput and latency with and without admission control.
+
+        Args:
+            shoppers: The number of concurrent shoppers. Default is 32.
+            duration: The duration of each measurement in seconds. Default is 5.
+        """
+        logging.getLogger("django.request").setLevel(logging.ERROR)  # Rejections are expected, don't log each one.
+        users = [
+            UserProfile.objects.create_user(username=f"admission_{i}", password="password") for i in range(shoppers)
+        ]
+        configurations = {
+            "unlimited": {"SHOPPING_RATE_LIMITS": {}, "SHOPPING_CHECKOUT_CONCURRENCY": shoppers},
+            "limited": {},
+        }
+        in_memory_layer = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+        for name, overrides in configurations.items():
+            with override_settings(ALLOWED_HOSTS=["testserver"], CHANNEL_LAYERS=in_memory_layer, **overrides):
+                results = AdmissionBenchmark._measure(users, duration)
+            accepted = sorted(results.pop(302, []))
+            rejected = {status: len(values) for status, values in results.items()}
+            if accepted:
+                p50, p99 = statistics.median(accepted), accepted[int(len(accepted) * 0.99)]
+                latency = f"p50 {p50 * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms"
+            else:
+                latency = "no accepted requests"
+            print(f"{name:>10}: {len(accepted) / duration:8.1f} checkouts/s ({latency}), rejected {rejected}")
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from django.db import connection
+
+from profiles.models import UserProfile
+from shopping import bulk_operations
+from shopping.models import Cart, CartItem, Item
+
+
+class BulkBenchmark:
+    """Class measuring the recall of an item held in many carts while other buyers keep reserving stock."""
+    @staticmethod
+    def _populate(carts: int, item: Item, batch_size: int = 50_000) -> None:
+        """Creates users whose carts all hold the item.
+
+        Args:
+            carts: The number of carts.
+            item: The item put in every cart.
+            batch_size: The number of rows inserted per statement batch. Default is 50000.
+        """
+        for start in range(0, carts, batch_size):
+            users = UserProfile.objects.bulk_create(
+                [UserProfile(username=f"bulk-{i}") for i in range(start, min(start + batch_size, carts))]
+            )
+            new_carts = Cart.objects.bulk_create([Cart(user_profile=user) for user in users])
+            CartItem.objects.bulk_create([CartItem(cart=cart, item=item) for cart in new_carts])
+        Item.objects.filter(pk=item.pk).update(stock=carts + 1000, reserved=carts)
+
+    @staticmethod
+    def _buyer(item_id: int, stop: threading.Event, latencies: list[float]) -> None:
+        """Reserves and releases a unit of another item until stopped, recording each round trip.
+
+        Args:
+            item_id: The ID of the item reserved by the buyer.
+            stop: The event stopping the buyer.
+            latencies: The list receiving the round trip durations in seconds.
+        """
+        try:
+            while not stop.is_set():
+                started_at = time.perf_counter()
+                Item.objects.reserve(item_id)
+                Item.objects.release({item_id: 1})
+                latencies.append(time.perf_counter() - started_at)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def run(carts: int = 200_000, batch_size: int = 10_000) -> None:
+        """Static method that recalls an item from every cart and prints the duration and the buyers' latency.
+
+        Args:
+            carts: The number of carts holding the recalled item. Default is 200000.
+            batch_size: The number of cart items deleted per transaction. Default is 10000.
+        """
+        recalled = Item.objects.create(name="Recalled item", price=10)
+        other = Item.objects.create(name="Other item", price=10, stock=10)
+        BulkBenchmark._populate(carts, recalled)
+
+        latencies: list[float] = []
+        stop = threading.Event()
+        buyer = threading.Thread(target=BulkBenchmark._buyer, args=(other.pk, stop, latencies))
+        buyer.start()
+        result = bulk_operations.recall_item(recalled.pk, batch_size=batch_size)
+        stop.set()
+        buyer.join()
+
+        print(
+            f"Recalled an item from {result.rows} carts in {result.batches} batches, {result.elapsed:.2f}s "
+            f"({result.rows / result.elapsed:.0f} carts/s); {len(latencies)} concurrent reservations, "
+            f"slowest {max(latencies, default=0) * 1000:.0f}ms"
+        )
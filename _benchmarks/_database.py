@@ -0,0 +1,97 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Mapping
+
+from ecommerce.backends.sqlite3.base import DEFAULT_PRAGMAS, apply_pragmas
+
+
+class DatabaseBenchmark:
+    """Class comparing the throughput of a default and a tuned SQLite database under concurrent access."""
+    @staticmethod
+    def _worker(path: Path, pragmas: Mapping[str, Any], deadline: float, counters: dict[str, int],
+                lock: threading.Lock) -> None:
+        """Runs a read-heavy mix of queries with one write per ten reads until the deadline.
+
+        Args:
+            path: The path of the database file.
+            pragmas: The PRAGMA statements applied to the connection.
+            deadline: The `time.perf_counter` value at which the worker stops.
+            counters: Shared counters of completed operations and lock errors.
+            lock: The lock guarding `counters`.
+        """
+        connection = sqlite3.connect(path, timeout=0.1, isolation_level=None, check_same_thread=False)
+        configured = False
+        operations = errors = 0
+        while time.perf_counter() < deadline:
+            try:
+                if not configured:
+                    apply_pragmas(connection, pragmas)
+                    configured = True
+                elif operations % 10 == 0:
+                    connection.execute("INSERT INTO item (name, price) VALUES ('Item', 10)")
+                else:
+                    connection.execute(
+                        "SELECT SUM(price) FROM item WHERE id > (SELECT MAX(id) - 100 FROM item)"
+                    ).fetchone()
+                operations += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        connection.close()
+        with lock:
+            counters["operations"] += operations
+            counters["errors"] += errors
+
+    @staticmethod
+    def _measure(pragmas: Mapping[str, Any], threads: int, duration: float) -> dict[str, int]:
+        """Measures the throughput of a fresh database file with the given PRAGMA statements.
+
+        Args:
+            pragmas: The PRAGMA statements applied to every connection.
+            threads: The number of concurrent workers.
+            duration: The measurement duration in seconds.
+
+        Returns:
+            A dictionary with the number of completed operations and "database is locked" errors.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "benchmark.sqlite3"
+            connection = sqlite3.connect(path)
+            apply_pragmas(connection, pragmas)
+            connection.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT, price INTEGER)")
+            connection.commit()
+            connection.close()
+
+            counters = {"operations": 0, "errors": 0}
+            lock = threading.Lock()
+            deadline = time.perf_counter() + duration
+            workers = [
+                threading.Thread(target=DatabaseBenchmark._worker, args=(path, pragmas, deadline, counters, lock))
+                for _ in range(threads)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            return counters
+
+    @staticmethod
+    def run(threads: int = 8, duration: float = 5.0) -> None:
+        """Static method that prints the throughput of the default and the tuned SQLite configurations.
+
+        Args:
+            threads: The number of concurrent workers. Default is 8.
+            duration: The duration of each measurement in seconds. Default is 5.
+        """
+        configurations = {
+            "default": {"synchronous": "FULL"},
+            "tuned": DEFAULT_PRAGMAS,
+        }
+        for name, pragmas in configurations.items():
+            counters = DatabaseBenchmark._measure(pragmas, threads, duration)
+            print(
+                f"{name:>8}: {counters['operations'] / duration:10.0f} ops/s, "
+                f"{counters['errors']} 'database is locked' errors"
+            )
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from django.db import OperationalError, connection, transaction
+
+from shopping.models import Item
+
+
+class InventoryBenchmark:
+    """Class measuring concurrent buyers competing for the stock of a single item."""
+    @staticmethod
+    def _buyer(item_id: int, start: threading.Event, results: dict[str, int], lock: threading.Lock) -> None:
+        """Reserves one unit of the item and immediately checks it out.
+
+        Args:
+            item_id: The ID of the contested item.
+            start: The event releasing all buyers at once.
+            results: Shared counters of successful, rejected and failed buyers.
+            lock: The lock guarding `results`.
+        """
+        start.wait()
+        try:
+            if not Item.objects.reserve(item_id):
+                outcome = "sold_out"
+            else:
+                with transaction.atomic():
+                    outcome = "bought" if Item.objects.commit([item_id]) else "sold_out"
+        except OperationalError:
+            outcome = "errors"
+        finally:
+            connection.close()
+        with lock:
+            results[outcome] += 1
+
+    @staticmethod
+    def run(buyers: int = 300, stock: int = 100) -> None:
+        """Static method that lets many buyers compete for a single item and prints the outcome.
+
+        Args:
+            buyers: The number of concurrent buyers. Default is 300.
+            stock: The number of units in stock. Default is 100.
+        """
+        item = Item.objects.create(name="Hot item", price=10, stock=stock)
+        results = {"bought": 0, "sold_out": 0, "errors": 0}
+        lock = threading.Lock()
+        start = threading.Event()
+        threads = [
+            threading.Thread(target=InventoryBenchmark._buyer, args=(item.pk, start, results, lock))
+            for _ in range(buyers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        started_at = time.perf_counter()
+        start.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started_at
+
+        item.refresh_from_db()
+        print(
+            f"{buyers} buyers for {stock} units in {elapsed:.2f}s: {results['bought']} bought, "
+            f"{results['sold_out']} sold out, {results['errors']} errors, "
+            f"stock left {item.stock}, reserved {item.reserved}"
+        )
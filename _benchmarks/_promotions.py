@@ -0,0 +1,67 @@
+import random
+import time
+
+from shopping.models import Item, Promotion
+from shopping.promotions import PromotionEngine
+
+
+class PromotionsBenchmark:
+    """Class measuring the pricing of large carts against a large number of active promotions."""
+    @staticmethod
+    def _create_promotions(promotions: int, items: list[Item]) -> None:
+        """Creates active promotions of every kind, most of them applying to a few random items.
+
+        Args:
+            promotions: The number of promotions.
+            items: The items of the catalog.
+        """
+        kinds = [Promotion.Kind.PERCENTAGE, Promotion.Kind.FIXED, Promotion.Kind.BUY_X_GET_Y]
+        created = Promotion.objects.bulk_create(
+            [
+                Promotion(
+                    name=f"Promotion #{i}", kind=random.choice(kinds), value=random.randint(1, 50),
+                    buy_quantity=2, get_quantity=1
+                )
+                for i in range(promotions - 10)
+            ]
+            + [
+                Promotion(name=f"Threshold #{i}", kind=Promotion.Kind.THRESHOLD, value=i + 1, threshold=(i + 1) * 1000)
+                for i in range(10)
+            ]
+        )
+        promotion_items = Promotion.items.through
+        promotion_items.objects.bulk_create(
+            [
+                promotion_items(promotion_id=promotion.pk, item_id=item.pk)
+                for promotion in created if promotion.kind != Promotion.Kind.THRESHOLD
+                for item in random.sample(items, 5)
+            ],
+            batch_size=10_000
+        )
+
+    @staticmethod
+    def run(promotions: int = 10_000, items: int = 10_000, cart_size: int = 1000, carts: int = 100) -> None:
+        """Static method that prints the load time of the promotions and the average pricing time of a cart.
+
+        Args:
+            promotions: The number of active promotions. Default is 10000.
+            items: The number of items in the catalog. Default is 10000.
+            cart_size: The number of items per cart. Default is 1000.
+            carts: The number of priced carts. Default is 100.
+        """
+        catalog = Item.objects.bulk_create(
+            [Item(name=f"Item #{i}", price=random.randint(1, 500), stock=1) for i in range(items)]
+        )
+        PromotionsBenchmark._create_promotions(promotions, catalog)
+
+        started_at = time.perf_counter()
+        engine = PromotionEngine.load()
+        elapsed = time.perf_counter() - started_at
+        print(f"Loaded {promotions} promotions in {elapsed * 1000:.0f}ms")
+
+        samples = [random.sample(catalog, cart_size) for _ in range(carts)]
+        started_at = time.perf_counter()
+        for cart in samples:
+            engine.price(cart)
+        elapsed = time.perf_counter() - started_at
+        print(f"Priced a {cart_size}-item cart in {elapsed * 1000 / carts:.2f}ms on average")
@@ -0,0 +1,62 @@
+import random
+import time
+
+from profiles.models import UserProfile
+from shopping.models import Item, ItemNeighbour
+from shopping.models.order import Order
+
+
+class RecommendationsBenchmark:
+    """Class measuring the full rebuild of the "frequently bought together" table."""
+    @staticmethod
+    def _create_order_history(order_lines: int, items: int, basket_size: int) -> None:
+        """Creates a random order history with the given number of order lines.
+
+        Args:
+            order_lines: The total number of order lines.
+            items: The number of items in the catalog.
+            basket_size: The number of items per order.
+        """
+        user = UserProfile.objects.create_user(username="recommendations", password="password")
+        item_ids = [
+            item.pk for item in Item.objects.bulk_create(
+                [Item(name=f"Item #{i}", price=10, stock=1) for i in range(items)]
+            )
+        ]
+        # A skewed popularity so that some items are much more often bought together than others.
+        weights = [1 / (rank + 1) for rank in range(items)]
+        order_items = Order.items.through
+        for _ in range(0, order_lines // basket_size, 10_000):
+            orders = Order.objects.bulk_create([Order(user_profile=user) for _ in range(10_000)])
+            order_items.objects.bulk_create(
+                [
+                    order_items(order_id=order.pk, item_id=item_id)
+                    for order in orders
+                    for item_id in set(random.choices(item_ids, weights, k=basket_size))
+                ],
+                batch_size=10_000
+            )
+
+    @staticmethod
+    def run(order_lines: int = 1_000_000, items: int = 10_000, basket_size: int = 4) -> None:
+        """Static method that prints the duration of a full rebuild over a random order history.
+
+        Args:
+            order_lines: The total number of order lines. Default is 1000000.
+            items: The number of items in the catalog. Default is 10000.
+            basket_size: The number of items per order. Default is 4.
+        """
+        RecommendationsBenchmark._create_order_history(order_lines, items, basket_size)
+        lines = Order.items.through.objects.count()
+
+        started_at = time.perf_counter()
+        stored = ItemNeighbour.objects.rebuild(top_k=10)
+        elapsed = time.perf_counter() - started_at
+        print(f"Rebuilt {stored} neighbours from {lines} order lines in {elapsed:.2f}s ({lines / elapsed:.0f} lines/s)")
+
+        lookups = random.sample(list(Item.objects.values_list("pk", flat=True)), 1000)
+        started_at = time.perf_counter()
+        for item_id in lookups:
+            ItemNeighbour.objects.recommend([item_id])
+        elapsed = time.perf_counter() - started_at
+        print(f"Cart recommendation lookup: {elapsed * 1000 / len(lookups):.3f}ms on average")
@@ -0,0 +1,84 @@
+import http.client
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+
+class WorkersBenchmark:
+    """Class measuring how the HTTP throughput of `serve_workers` scales with the number of workers."""
+    @staticmethod
+    def _client(port: int, path: str, duration: float) -> int:
+        """Sends requests over one keep-alive connection until the duration elapses.
+
+        Args:
+            port: The port of the server.
+            path: The requested path.
+            duration: The duration in seconds.
+
+        Returns:
+            The number of successful responses.
+        """
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        deadline = time.perf_counter() + duration
+        served = 0
+        while time.perf_counter() < deadline:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            served += response.status == 200
+        connection.close()
+        return served
+
+    @staticmethod
+    def _start(workers: int) -> tuple[subprocess.Popen, int]:
+        """Starts `serve_workers` on a free port and waits until all its workers are ready.
+
+        Args:
+            workers: The number of workers.
+
+        Returns:
+            The master process and its port.
+        """
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        master = subprocess.Popen(
+            [sys.executable, "manage.py", "serve_workers", "--port", str(port), "--workers", str(workers)],
+            cwd=Path(settings.BASE_DIR), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        for line in master.stderr:
+            if line.startswith("Serving on"):
+                break
+        # Keep draining the log so that the master never blocks on a full pipe.
+        threading.Thread(target=master.stderr.read, daemon=True).start()
+        return master, port
+
+    @staticmethod
+    def run(worker_counts: tuple[int, ...] = (1, 2, 4), clients: int = 16, duration: float = 5.0) -> None:
+        """Static method that prints the requests per second served by each number of workers.
+
+        Args:
+            worker_counts: The numbers of workers to measure. Default is 1, 2 and 4.
+            clients: The number of concurrent client processes. Default is 16.
+            duration: The duration of each measurement in seconds. Default is 5.
+        """
+        print(f"{os.cpu_count()} CPU(s), {clients} keep-alive clients fetching the login page")
+        for workers in worker_counts:
+            master, port = WorkersBenchmark._start(workers)
+            try:
+                with multiprocessing.Pool(clients) as pool:
+                    served = sum(pool.starmap(
+                        WorkersBenchmark._client, [(port, "/profiles/login/", duration)] * clients
+                    ))
+            finally:
+                master.send_signal(signal.SIGTERM)
+                master.wait()
+            print(f"{workers} worker(s): {served / duration:.0f} requests/s")
@@ -4,13 +4,14 @@ from shopping.models import Item
 class ItemGenerator:
     """Class representing an item generator."""
     @staticmethod
-    def create_items(cnt: int = 10) -> None:
+    def create_items(cnt: int = 10, stock: int = 100) -> None:
         """Static method that creates one or more items.
 
         Args:
             cnt: The number of items to create. Default is 10.
+            stock: The number of units in stock of each item. Default is 100.
         """
         items = []
         for i in range(cnt):
-            items.append(Item(name=f"Item #{i + 1}", price=(i + 1) * 10))
+            items.append(Item(sku=f"SKU-{i + 1:06d}", name=f"Item #{i + 1}", price=(i + 1) * 10, stock=stock))
         Item.objects.bulk_create(items)
@@ -15,7 +15,11 @@ from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
 
+from ecommerce import startup
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings')
+# Serving processes warm up while the apps load and preload their caches afterwards, see `ecommerce.startup`.
+os.environ.setdefault('DJANGO_STARTUP_WARMUP', '1')
 
 django_asgi_app = get_asgi_application()
 
@@ -29,3 +33,5 @@ application = ProtocolTypeRouter(
         ),
     }
 )
+
+startup.preload_apps()
@@ -0,0 +1,55 @@
+import sqlite3
+from typing import Any, Mapping
+
+from django.db.backends.sqlite3 import base
+
+# Defaults tuned for several daphne workers sharing one database file.
+# The busy timeout comes first so that switching the journal mode waits for concurrent writers.
+DEFAULT_PRAGMAS: dict[str, Any] = {
+    "busy_timeout": 5000,
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 134217728,
+    "cache_size": -20000,
+    "temp_store": "MEMORY",
+}
+
+
+def apply_pragmas(connection: sqlite3.Connection, pragmas: Mapping[str, Any]) -> None:
+    """Applies the given PRAGMA statements to a freshly opened SQLite connection.
+
+    Args:
+        connection: The raw sqlite3 connection.
+        pragmas: A mapping of PRAGMA names to their values.
+    """
+    for name, value in pragmas.items():
+        connection.execute(f"PRAGMA {name} = {value}")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite backend that tunes every new connection for concurrent access.
+
+    The PRAGMA statements are read from the ``PRAGMAS`` key of the database settings and fall back to
+    `DEFAULT_PRAGMAS`. ``OPTIONS`` cannot be used for this since Django passes it straight to `sqlite3.connect`.
+
+    Transactions take the write lock when they begin (``TRANSACTION_MODE``, ``IMMEDIATE`` by default). A deferred
+    transaction that reads before it writes fails with "database is locked" right away when another connection
+    writes, since SQLite cannot wait on the busy timeout when upgrading its read lock.
+
+    """
+    def get_new_connection(self, conn_params: dict[str, Any]) -> sqlite3.Connection:
+        """Opens a new connection and applies the configured PRAGMA statements to it.
+
+        Args:
+            conn_params: The keyword arguments passed to `sqlite3.connect`.
+
+        Returns:
+            The raw sqlite3 connection.
+        """
+        connection = super().get_new_connection(conn_params)
+        apply_pragmas(connection, self.settings_dict.get("PRAGMAS", DEFAULT_PRAGMAS))
+        return connection
+
+    def _start_transaction_under_autocommit(self) -> None:
+        """Starts a transaction in the configured transaction mode."""
+        self.cursor().execute(f"BEGIN {self.settings_dict.get('TRANSACTION_MODE', 'IMMEDIATE')}")
@@ -0,0 +1,107 @@
+"""
+Environment driven database configuration for the ecommerce project.
+
+The following environment variables are recognised:
+
+* ``DATABASE_ENGINE``: ``sqlite3`` (default) or ``postgresql``.
+* ``DATABASE_NAME``: The database name, or the file path for SQLite.
+* ``DATABASE_USER``, ``DATABASE_PASSWORD``, ``DATABASE_HOST``, ``DATABASE_PORT``: PostgreSQL credentials.
+* ``DATABASE_CONN_MAX_AGE``: Lifetime of persistent connections in seconds, ``0`` disables them. Default is 60.
+* ``DATABASE_REPLICA_HOST`` (PostgreSQL) or ``DATABASE_REPLICA_NAME`` (SQLite): Enables the ``replica`` alias.
+"""
+from pathlib import Path
+from typing import Any, Mapping
+
+from django.core.exceptions import ImproperlyConfigured
+
+REPLICA_DATABASE_ALIAS = "replica"
+
+ENGINES = {
+    "sqlite3": "ecommerce.backends.sqlite3",
+    "postgresql": "django.db.backends.postgresql",
+}
+
+
+def _base_config(env: Mapping[str, str]) -> dict[str, Any]:
+    """Builds the settings shared by the default and the replica aliases.
+
+    Args:
+        env: The environment to read the configuration from.
+
+    Returns:
+        A dictionary with the engine independent database settings.
+    """
+    return {
+        "CONN_MAX_AGE": int(env.get("DATABASE_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+    }
+
+
+def _sqlite_config(name: str, env: Mapping[str, str]) -> dict[str, Any]:
+    """Builds the settings of an SQLite database alias.
+
+    Args:
+        name: The path of the database file.
+        env: The environment to read the configuration from.
+
+    Returns:
+        A dictionary of database settings.
+    """
+    # The busy timeout is set by the backend with the other PRAGMA statements, see DEFAULT_PRAGMAS.
+    return _base_config(env) | {
+        "ENGINE": ENGINES["sqlite3"],
+        "NAME": name,
+    }
+
+
+def _postgresql_config(host: str, env: Mapping[str, str]) -> dict[str, Any]:
+    """Builds the settings of a PostgreSQL database alias.
+
+    Args:
+        host: The host name of the database server.
+        env: The environment to read the configuration from.
+
+    Returns:
+        A dictionary of database settings.
+    """
+    return _base_config(env) | {
+        "ENGINE": ENGINES["postgresql"],
+        "NAME": env.get("DATABASE_NAME", "ecommerce"),
+        "USER": env.get("DATABASE_USER", ""),
+        "PASSWORD": env.get("DATABASE_PASSWORD", ""),
+        "HOST": host,
+        "PORT": env.get("DATABASE_PORT", ""),
+    }
+
+
+def get_databases(env: Mapping[str, str], base_dir: Path) -> dict[str, dict[str, Any]]:
+    """Builds the ``DATABASES`` setting from the environment.
+
+    Args:
+        env: The environment to read the configuration from, usually `os.environ`.
+        base_dir: The project directory holding the default SQLite database file.
+
+    Returns:
+        A dictionary suitable for the ``DATABASES`` setting.
+
+    Raises:
+        ImproperlyConfigured: If ``DATABASE_ENGINE`` is not supported.
+    """
+    engine = env.get("DATABASE_ENGINE", "sqlite3")
+    if engine not in ENGINES:
+        raise ImproperlyConfigured(f"Unsupported DATABASE_ENGINE {engine!r}, expected one of {', '.join(ENGINES)}.")
+
+    if engine == "sqlite3":
+        databases = {"default": _sqlite_config(env.get("DATABASE_NAME", str(base_dir / "db.sqlite3")), env)}
+        replica = env.get("DATABASE_REPLICA_NAME")
+        if replica:
+            databases[REPLICA_DATABASE_ALIAS] = _sqlite_config(replica, env)
+    else:
+        databases = {"default": _postgresql_config(env.get("DATABASE_HOST", "localhost"), env)}
+        replica = env.get("DATABASE_REPLICA_HOST")
+        if replica:
+            databases[REPLICA_DATABASE_ALIAS] = _postgresql_config(replica, env)
+
+    if REPLICA_DATABASE_ALIAS in databases:
+        databases[REPLICA_DATABASE_ALIAS]["TEST"] = {"MIRROR": "default"}
+    return databases
@@ -0,0 +1,61 @@
+from typing import Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Model
+
+from ecommerce.database import REPLICA_DATABASE_ALIAS
+
+
+def get_replica_alias() -> str:
+    """Returns the alias of the database that read-only pages read from.
+
+    Returns:
+        The replica alias if a replica is configured, otherwise the default alias.
+    """
+    return REPLICA_DATABASE_ALIAS if REPLICA_DATABASE_ALIAS in settings.DATABASES else DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    """Database router keeping the ``replica`` alias read-only.
+
+    Reads are never routed to the replica implicitly, since it may lag behind and cannot take part in the
+    transactions of the default database. The read-only pages, the catalog and the order history, opt in with
+    ``.using(get_replica_alias())``; every other read and every write goes to the default database.
+
+    """
+    def db_for_write(self, model: type[Model], **hints) -> Optional[str]:
+        """Sends every write to the default database.
+
+        Args:
+            model: The model class being written.
+            **hints: Additional routing hints.
+
+        Returns:
+            The default alias.
+        """
+        return "default"
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints) -> Optional[bool]:
+        """Allows relations between objects since the replica mirrors the default database.
+
+        Returns:
+            Always True.
+        """
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, model_name: Optional[str] = None, **hints) -> Optional[bool]:
+        """Prevents migrations from running against the replica.
+
+        Args:
+            db: The database alias.
+            app_label: The label of the migrated app.
+            model_name: The name of the migrated model.
+            **hints: Additional routing hints.
+
+        Returns:
+            False for the replica alias, otherwise None.
+        """
+        if db == REPLICA_DATABASE_ALIAS:
+            return False
+        return None
@@ -14,6 +14,8 @@ from pathlib import Path
 
 from django.urls import reverse_lazy
 
+from ecommerce.database import get_databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -25,9 +27,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure--!r4kr%j&s0(f0nv5h^-=hu+dk8luq-$+(&i*aho_@0a_o&it#'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get("DJANGO_DEBUG", "1") == "1"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(",") if host]
 
 
 # Application definition
@@ -61,6 +63,7 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
+        # Without explicit loaders Django uses the cached loader, which runserver resets when a template is edited.
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -68,6 +71,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'shopping.context_processors.account_summary',
             ],
         },
     },
@@ -79,12 +83,24 @@ WSGI_APPLICATION = 'ecommerce.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
-DATABASES = {
+# Configured from the environment, see ecommerce/database.py for the recognised variables.
+DATABASES = get_databases(os.environ, BASE_DIR)
+DATABASE_ROUTERS = ["ecommerce.routers.ReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+if os.environ.get("CACHE_REDIS_URL"):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ["CACHE_REDIS_URL"],
+    }
 
 
 # Password validation
@@ -122,6 +138,11 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.1/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = os.environ.get("STATIC_ROOT", BASE_DIR / "staticfiles")
+STATICFILES_DIRS = [BASE_DIR / "static"]
+# Outside development, collectstatic writes content-hashed, precompressed copies served with far-future caching.
+if not DEBUG:
+    STATICFILES_STORAGE = "ecommerce.staticfiles.CompressedManifestStaticFilesStorage"
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
@@ -131,6 +152,27 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = "profiles.UserProfile"
 LOGIN_URL = reverse_lazy("profiles:login")
 ASGI_APPLICATION = "ecommerce.asgi.application"
+# Whether the apps warm up their URLs and templates when they are ready and preload their caches once Django is set
+# up, see `ecommerce.startup`. Enabled by the ASGI and WSGI entry points, not by management commands.
+STARTUP_WARMUP = os.environ.get("DJANGO_STARTUP_WARMUP", "0") == "1"
+
+# Logging
+# https://docs.djangoproject.com/en/4.1/topics/logging/
+
+# The worker pool reports the startup phases and warm-up of every worker at the INFO level.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "ecommerce.workers": {
+            "handlers": ["console"],
+            "level": os.environ.get("DJANGO_WORKERS_LOG_LEVEL", "INFO"),
+        },
+    },
+}
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
@@ -139,3 +181,28 @@ CHANNEL_LAYERS = {
         },
     },
 }
+
+# Shopping
+# Seconds after which an item sitting in a cart loses its stock reservation.
+SHOPPING_RESERVATION_TTL = 30 * 60
+# Seconds after which an unmodified cart is considered abandoned and swept.
+SHOPPING_CART_TTL = 30 * 24 * 60 * 60
+# Token buckets limiting each user per route: "rate" requests per second with bursts of up to "burst" requests.
+SHOPPING_RATE_LIMITS = {
+    "add-to-cart": {"rate": 2, "burst": 10},
+    "checkout": {"rate": 0.5, "burst": 3},
+}
+# Maximum number of checkouts served concurrently by one process, and the Retry-After sent beyond it.
+SHOPPING_CHECKOUT_CONCURRENCY = 4
+SHOPPING_CHECKOUT_RETRY_AFTER = 1
+# Lifetime in seconds and maximum number of items of the signed cookie carts of anonymous users.
+SHOPPING_COOKIE_CART_MAX_AGE = 30 * 24 * 60 * 60
+SHOPPING_COOKIE_CART_MAX_ITEMS = 50
+
+# Notifications
+# Seconds between two pings sent to each WebSocket client.
+NOTIFICATIONS_HEARTBEAT_INTERVAL = 25
+# Seconds without any message from a client after which its connection is closed.
+NOTIFICATIONS_IDLE_TIMEOUT = 60
+# Maximum number of concurrent WebSocket connections of a user, the oldest ones being closed first.
+NOTIFICATIONS_MAX_CONNECTIONS_PER_USER = 5
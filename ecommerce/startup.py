@@ -0,0 +1,148 @@
+"""Startup instrumentation and warm-up of new processes.
+
+Phases of the startup are timed with `timed` into `timings`. `python manage.py startup_profile` starts a fresh
+interpreter with ``-X importtime``, times the ``ready`` hook of every app and reports the slowest imports.
+
+With ``STARTUP_WARMUP`` enabled, the apps warm up in their ``ready`` hooks: the URL resolvers are populated and the
+templates compiled, without touching the database. Once Django is set up, the ASGI and WSGI entry points run
+`preload_apps`, whose app hooks may query the database, e.g. to render the catalog into the cache. The first request
+of a process is therefore served at steady-state latency, whatever server loads the entry point.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Durations in seconds of the startup phases of this process, in the order they completed.
+timings: dict[str, float] = {}
+
+
+@dataclass
+class ImportTime:
+    """The import time of a module as reported by ``python -X importtime``.
+
+    Attributes:
+        module: The name of the module.
+        self_us: The microseconds spent in the module itself.
+        cumulative_us: The microseconds spent in the module and the modules it imported first.
+        depth: The nesting level of the import, 0 for modules imported by the entry point.
+    """
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Records the duration of a startup phase in `timings`.
+
+    Args:
+        phase: The name of the phase.
+    """
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = time.perf_counter() - started_at
+
+
+def warm_up_urls() -> None:
+    """Imports the URL configuration with its views and populates the reverse lookup tables."""
+    from django.urls import get_resolver
+
+    # Reading the lookup tables of a resolver populates them, importing the views on the way.
+    for _, namespace_resolver in get_resolver().namespace_dict.values():
+        namespace_resolver.reverse_dict.keys()
+
+
+def warm_up_templates(template_names: Iterable[str]) -> None:
+    """Compiles templates into the cached template loader.
+
+    Args:
+        template_names: The names of the templates to compile.
+    """
+    from django.template.loader import get_template
+
+    for template_name in template_names:
+        get_template(template_name)
+
+
+def preload_apps() -> None:
+    """Runs the ``preload`` hook of every app defining one, if ``STARTUP_WARMUP`` is enabled.
+
+    Called by the entry points once Django is set up, so unlike the ``ready`` hooks the preload hooks may query the
+    database. The connections opened on the way are closed, the serving threads open their own.
+    """
+    from django.apps import apps
+    from django.conf import settings
+    from django.db import connections
+
+    if not settings.STARTUP_WARMUP:
+        return
+    for app_config in apps.get_app_configs():
+        preload = getattr(app_config, "preload", None)
+        if preload is not None:
+            with timed(f"preload: {app_config.label}"):
+                preload()
+    connections.close_all()
+
+
+def parse_importtime(lines: Iterable[str]) -> list[ImportTime]:
+    """Parses the report written to stderr by ``python -X importtime``.
+
+    Args:
+        lines: The lines of the report, other lines being ignored.
+
+    Returns:
+        The import times in import completion order.
+    """
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # The header line.
+        imports.append(
+            ImportTime(
+                module=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name.rstrip("\n")) - len(name.strip()) - 1) // 2,
+            )
+        )
+    return imports
+
+
+def profile_child() -> None:
+    """Entry point of the interpreter started by `startup_profile`.
+
+    Sets Django up, timing the ``ready`` hook of every app, loads the ASGI application and prints `timings` as JSON.
+    """
+    import django
+    from django.apps import AppConfig
+
+    create = AppConfig.create.__func__
+
+    def create_timed(cls, entry):
+        app_config = create(cls, entry)
+        ready = app_config.ready
+
+        def timed_ready():
+            with timed(f"ready: {app_config.label}"):
+                ready()
+
+        app_config.ready = timed_ready
+        return app_config
+
+    AppConfig.create = classmethod(create_timed)
+    with timed("django.setup"):
+        django.setup()
+    with timed("ecommerce.asgi"):
+        import ecommerce.asgi  # noqa: F401
+    print(json.dumps(timings))
@@ -0,0 +1,98 @@
+import gzip
+from pathlib import Path
+from typing import Iterator
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views import static
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Hashed files never change, so browsers may keep them for a year without revalidating.
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# Files served under their original name may change with the next deployment.
+MUTABLE_MAX_AGE = 60
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes gzip and, when the brotli package is installed, brotli variants.
+
+    The variants are written next to each collected file, e.g. ``bootstrap.0123456789ab.min.css.gz``, so that they
+    are compressed once at deploy time at the highest level instead of on every response.
+
+    Attributes:
+        compressed_extensions: The extensions of the text-based files worth compressing.
+        min_size: The size in bytes below which files are not compressed.
+
+    """
+    compressed_extensions = (".css", ".js", ".map", ".json", ".txt", ".html", ".svg", ".eot", ".ttf")
+    min_size = 256
+
+    def post_process(self, paths: dict, dry_run: bool = False, **options) -> Iterator[tuple]:
+        """Hashes the collected files, then writes the compressed variants of the original and hashed files.
+
+        Args:
+            paths: The collected files, mapping their names to their storage and path.
+            dry_run: Whether to only report what would be done.
+            **options: The options of the collectstatic command.
+
+        Yields:
+            The tuples of the original name, the hashed name and whether the file was processed.
+        """
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in {*paths, *self.hashed_files.values()}:
+            if name.endswith(self.compressed_extensions):
+                self._compress(Path(self.path(name)))
+
+    def _compress(self, path: Path) -> None:
+        """Writes the compressed variants of a file, skipping those that would not be smaller.
+
+        Args:
+            path: The path of the file.
+        """
+        content = path.read_bytes()
+        if len(content) < self.min_size:
+            return
+        variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(content)
+        for suffix, compressed in variants.items():
+            if len(compressed) < len(content):
+                path.with_name(path.name + suffix).write_bytes(compressed)
+
+
+def serve(request: HttpRequest, path: str) -> HttpResponse:
+    """Serves a collected static file, preferring its precompressed variant accepted by the client.
+
+    Hashed files are sent with far-future cache headers. Used when DEBUG is off and no front server handles
+    STATIC_URL.
+
+    Args:
+        request: The HTTP request.
+        path: The path of the file relative to STATIC_ROOT.
+
+    Returns:
+        The file response.
+    """
+    accepted = {encoding.split(";")[0].strip() for encoding in request.headers.get("Accept-Encoding", "").split(",")}
+    served_path = path
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if encoding in accepted and Path(settings.STATIC_ROOT, path + suffix).is_file():
+            served_path = path + suffix
+            break
+
+    response = static.serve(request, served_path, document_root=settings.STATIC_ROOT)
+    response.headers.pop("Content-Disposition", None)
+    patch_vary_headers(response, ["Accept-Encoding"])
+    if path in getattr(staticfiles_storage, "hashed_files", {}).values():
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=MUTABLE_MAX_AGE)
+    return response
@@ -0,0 +1,197 @@
+import asyncio
+import gzip
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.apps import apps
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, router
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from ecommerce.database import get_databases
+from ecommerce.routers import ReplicaRouter, get_replica_alias
+from ecommerce.startup import parse_importtime, preload_apps
+from ecommerce.staticfiles import serve
+from ecommerce.workers import in_progress, warm_up
+from profiles.models import UserProfile
+from shopping.forms.purchase import PurchaseForm
+from shopping.models import Item
+from shopping.models.order import Order
+from shopping.views import OrderListView
+
+
+class GetDatabasesTestCase(SimpleTestCase):
+    def test_sqlite_defaults(self):
+        databases = get_databases({}, Path("/srv/app"))
+        self.assertEqual(list(databases), ["default"])
+        self.assertEqual(databases["default"]["ENGINE"], "ecommerce.backends.sqlite3")
+        self.assertEqual(databases["default"]["NAME"], "/srv/app/db.sqlite3")
+        self.assertNotIn("OPTIONS", databases["default"])  # The busy timeout is a PRAGMA of the backend.
+        self.assertEqual(databases["default"]["CONN_MAX_AGE"], 60)
+        self.assertTrue(databases["default"]["CONN_HEALTH_CHECKS"])
+
+    def test_postgresql_with_replica(self):
+        databases = get_databases(
+            {"DATABASE_ENGINE": "postgresql", "DATABASE_HOST": "primary", "DATABASE_REPLICA_HOST": "replica"},
+            Path("/srv/app")
+        )
+        self.assertEqual(databases["default"]["HOST"], "primary")
+        self.assertEqual(databases["replica"]["HOST"], "replica")
+        self.assertEqual(databases["replica"]["TEST"], {"MIRROR": "default"})
+
+    def test_unsupported_engine(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_databases({"DATABASE_ENGINE": "oracle"}, Path("/srv/app"))
+
+
+class ReplicaRouterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_without_replica(self):
+        self.assertEqual(get_replica_alias(), "default")
+        self.assertEqual(PurchaseForm().fields["items"].queryset.db, "default")
+
+    def test_with_replica(self):
+        with mock.patch.dict(settings.DATABASES, {"replica": {}}):
+            self.assertEqual(get_replica_alias(), "replica")
+            self.assertEqual(router.db_for_read(Item), "default")
+            self.assertEqual(router.db_for_read(Order), "default")
+            self.assertEqual(self.router.db_for_write(Item), "default")
+            self.assertFalse(self.router.allow_migrate("replica", "shopping"))
+
+            # Only the catalog of the unbound form and the order history are read from the replica.
+            self.assertEqual(PurchaseForm().fields["items"].queryset.db, "replica")
+            self.assertEqual(PurchaseForm({"items": []}).fields["items"].queryset.db, "default")
+            view = OrderListView(request=RequestFactory().get("/"))
+            view.request.user = UserProfile(pk=1)
+            self.assertEqual(view.get_queryset().db, "replica")
+
+
+class SQLiteBackendTestCase(TestCase):
+    def test_pragmas_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+
+@override_settings(STATICFILES_STORAGE="ecommerce.staticfiles.CompressedManifestStaticFilesStorage")
+class StaticFilesTestCase(SimpleTestCase):
+    def setUp(self):
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+        settings_override = override_settings(STATIC_ROOT=static_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+        self.bootstrap = staticfiles_storage.stored_name("vendor/bootstrap/css/bootstrap.min.css")
+
+    def test_collectstatic_writes_compressed_variants(self):
+        path = Path(settings.STATIC_ROOT, self.bootstrap)
+        self.assertNotEqual(self.bootstrap, "vendor/bootstrap/css/bootstrap.min.css")
+        self.assertEqual(gzip.decompress(path.with_name(path.name + ".gz").read_bytes()), path.read_bytes())
+
+    def test_serve_hashed_file(self):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        response = serve(request, self.bootstrap)
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_serve_original_file(self):
+        response = serve(RequestFactory().get("/"), "vendor/bootstrap/css/bootstrap.min.css")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+
+
+class WarmUpTestCase(SimpleTestCase):
+    @override_settings(ALLOWED_HOSTS=["*"])
+    def test_requests_every_path(self):
+        scopes = []
+
+        async def application(scope, receive, send):
+            scopes.append(scope)
+            await receive()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        with self.assertLogs("ecommerce.workers", "INFO") as logs:
+            self.assertTrue(asyncio.run(warm_up(application, ["/", "/profiles/login/"])))
+        self.assertEqual(
+            logs.output,
+            ["INFO:ecommerce.workers:Warmed up / (200)", "INFO:ecommerce.workers:Warmed up /profiles/login/ (200)"],
+        )
+        self.assertEqual([scope["path"] for scope in scopes], ["/", "/profiles/login/"])
+        self.assertEqual(scopes[0]["headers"], [(b"host", b"localhost")])
+
+    @override_settings(DEBUG=False, ALLOWED_HOSTS=[".shop.example.com", "admin.example.com"])
+    def test_requests_pass_the_allowed_hosts_check(self):
+        application = get_asgi_application()
+        with self.assertLogs("ecommerce.workers", "INFO") as logs:
+            self.assertTrue(asyncio.run(warm_up(application, ["/profiles/login/"])))
+        self.assertEqual(logs.output, ["INFO:ecommerce.workers:Warmed up /profiles/login/ (200)"])
+
+    def test_error_status_fails_the_warm_up(self):
+        async def application(scope, receive, send):
+            await send({"type": "http.response.start", "status": 400, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        with self.assertLogs("ecommerce.workers", "WARNING"):
+            self.assertFalse(asyncio.run(warm_up(application, ["/"])))
+
+
+class DrainTestCase(SimpleTestCase):
+    def test_only_requests_in_progress_are_waited_for(self):
+        from daphne.http_protocol import WebRequest
+        from daphne.ws_protocol import WebSocketProtocol
+
+        running = mock.Mock(spec=WebRequest, finished=False)
+        finished = mock.Mock(spec=WebRequest, finished=True)
+        upgraded = mock.Mock(spec=WebRequest, finished=False)
+        websocket = mock.Mock(spec=WebSocketProtocol)
+        connections = {running: {}, finished: {}, upgraded: {"disconnected": 1.0}, websocket: {}}
+
+        self.assertEqual(in_progress(connections, websocket=False), [running])
+        self.assertEqual(in_progress(connections, websocket=True), [websocket])
+
+
+class StartupTestCase(TestCase):
+    def test_parse_importtime(self):
+        imports = parse_importtime([
+            "import time: self [us] | cumulative | imported package\n",
+            "import time:       120 |        120 |   shopping.cache\n",
+            "import time:      4966 |       5086 | shopping.views\n",
+            "Warming up\n",
+        ])
+        self.assertEqual(
+            [(module.module, module.self_us, module.cumulative_us, module.depth) for module in imports],
+            [("shopping.cache", 120, 120, 1), ("shopping.views", 4966, 5086, 0)],
+        )
+
+    def test_ready_hooks_do_not_query_the_database_and_preload_caches_the_catalog(self):
+        cache.clear()
+        Item.objects.create(name="Item", price=10, stock=1)
+        with self.assertNumQueries(0):
+            apps.get_app_config("shopping").warm_up()
+            apps.get_app_config("profiles").warm_up()
+
+        with override_settings(STARTUP_WARMUP=True), mock.patch("django.db.connections.close_all") as close_all:
+            preload_apps()
+        close_all.assert_called_once()
+        with self.assertNumQueries(1):  # The catalog version, the catalog itself is cached.
+            response = self.client.get("/")
+        self.assertContains(response, "Item (10 USD)")
+
+    def test_startup_profile_command(self):
+        stdout = StringIO()
+        call_command("startup_profile", limit=3, warmup=False, stdout=stdout)
+        self.assertIn("ready: shopping", stdout.getvalue())
+        self.assertIn("Slowest modules", stdout.getvalue())
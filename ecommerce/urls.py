@@ -1,8 +1,16 @@
+import re
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from ecommerce import staticfiles
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("profiles/", include("profiles.urls")),
     path("", include("shopping.urls")),
 ]
+
+if not settings.DEBUG:
+    urlpatterns.append(re_path(rf"^{re.escape(settings.STATIC_URL.lstrip('/'))}(?P<path>.*)$", staticfiles.serve))
@@ -0,0 +1,348 @@
+"""A pre-forking launcher running several daphne workers behind one listening socket.
+
+The master process binds the socket and starts the workers, which inherit its file descriptor and accept
+connections from it, leaving the load balancing to the kernel. The master restarts crashed workers and, on SIGHUP,
+replaces the workers one by one: a new worker is started and warmed up before an old one stops accepting connections
+and drains. SIGTERM and SIGINT drain every worker and stop the master.
+
+Workers are started as fresh interpreters rather than plain forks of the master, so that a reload picks up new code
+and no worker shares the event loop or the database connections of the master.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Mapping, Optional, Sequence
+
+from ecommerce import startup
+
+logger = logging.getLogger(__name__)
+
+# Seconds a new worker is given to warm up and start accepting connections.
+READY_TIMEOUT = 60
+# Workers exiting sooner than this many seconds after starting are restarted after RESTART_DELAY seconds.
+CRASH_LOOP_UPTIME = 10
+RESTART_DELAY = 1
+# WebSocket close code asking clients to reconnect, sent to the sockets still open at the end of a drain.
+CLOSE_CODE_SERVICE_RESTART = 1012
+
+
+@dataclass
+class Worker:
+    """A worker process started by the pool.
+
+    Attributes:
+        process: The worker process.
+        ready_fd: The read end of the pipe the worker writes to once it accepts connections.
+        started_at: The monotonic time the worker was started at.
+        retiring: Whether the worker was asked to drain and must not be restarted.
+    """
+    process: subprocess.Popen
+    ready_fd: int
+    started_at: float = field(default_factory=time.monotonic)
+    retiring: bool = False
+
+
+class WorkerPool:
+    """The master process of the workers.
+
+    Attributes:
+        host: The IPv4 address to bind to.
+        port: The port to bind to.
+        size: The number of workers.
+        warmup_paths: The paths each worker requests from itself before accepting connections.
+        graceful_timeout: The number of seconds a draining worker waits for its in-flight requests.
+        restarts: The number of crashed workers restarted so far.
+
+    """
+    def __init__(self, host: str, port: int, size: int, warmup_paths: Sequence[str], graceful_timeout: int):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.warmup_paths = list(warmup_paths)
+        self.graceful_timeout = graceful_timeout
+        self.restarts = 0
+        self.workers: dict[int, Worker] = {}
+        self.socket: Optional[socket.socket] = None
+        self._reload_requested = False
+        self._stop_requested = False
+
+    def run(self) -> None:
+        """Binds the socket, starts the workers and supervises them until SIGTERM or SIGINT."""
+        self.socket = socket.create_server((self.host, self.port), backlog=2048)
+        signal.signal(signal.SIGHUP, self._request_reload)
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        for worker in [self.spawn() for _ in range(self.size)]:
+            self._wait_ready(worker)
+        logger.warning("Serving on %s:%s with %s worker(s)", self.host, self.port, self.size)
+        while not self._stop_requested:
+            self.reap()
+            if self._reload_requested:
+                self._reload_requested = False
+                self.reload()
+            time.sleep(0.2)
+        self.shutdown()
+
+    def spawn(self) -> Worker:
+        """Starts a worker accepting connections from the shared socket.
+
+        Returns:
+            The started worker.
+        """
+        ready_fd, ready_write_fd = os.pipe()
+        command = [
+            sys.executable, "-m", "ecommerce.workers",
+            "--fd", str(self.socket.fileno()), "--ready-fd", str(ready_write_fd),
+            "--graceful-timeout", str(self.graceful_timeout),
+            *(argument for path in self.warmup_paths for argument in ("--warmup-path", path)),
+        ]
+        process = subprocess.Popen(
+            command, pass_fds=(self.socket.fileno(), ready_write_fd), cwd=os.path.dirname(os.path.dirname(__file__))
+        )
+        os.close(ready_write_fd)
+        worker = Worker(process=process, ready_fd=ready_fd)
+        self.workers[process.pid] = worker
+        return worker
+
+    def reap(self) -> None:
+        """Forgets the exited workers and replaces the ones that crashed."""
+        for pid, worker in list(self.workers.items()):
+            if worker.process.poll() is None:
+                continue
+            del self.workers[pid]
+            os.close(worker.ready_fd)
+            if worker.retiring or self._stop_requested:
+                continue
+            logger.error("Worker %s exited with code %s, restarting it", pid, worker.process.returncode)
+            self.restarts += 1
+            if time.monotonic() - worker.started_at < CRASH_LOOP_UPTIME:
+                time.sleep(RESTART_DELAY)
+            self.spawn()
+
+    def reload(self) -> None:
+        """Replaces the workers one at a time, retiring an old worker only once its replacement is ready."""
+        logger.warning("Reloading %s worker(s)", self.size)
+        for worker in [worker for worker in self.workers.values() if not worker.retiring]:
+            replacement = self.spawn()
+            if not self._wait_ready(replacement):
+                logger.error("Worker %s failed to start, keeping the remaining old workers", replacement.process.pid)
+                replacement.retiring = True
+                replacement.process.kill()
+                return
+            worker.retiring = True
+            worker.process.send_signal(signal.SIGTERM)
+
+    def shutdown(self) -> None:
+        """Drains every worker, killing the ones still running after the graceful timeout."""
+        for worker in self.workers.values():
+            worker.retiring = True
+            worker.process.send_signal(signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        for worker in self.workers.values():
+            try:
+                worker.process.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                worker.process.kill()
+        self.reap()
+        self.socket.close()
+
+    def _wait_ready(self, worker: Worker) -> bool:
+        """Waits until a worker accepts connections.
+
+        Args:
+            worker: The started worker.
+
+        Returns:
+            True if the worker is ready, False if it exited or timed out.
+        """
+        readable, _, _ = select.select([worker.ready_fd], [], [], READY_TIMEOUT)
+        return bool(readable) and os.read(worker.ready_fd, 1) == b"1"
+
+    def _request_reload(self, signum, frame) -> None:
+        self._reload_requested = True
+
+    def _request_stop(self, signum, frame) -> None:
+        self._stop_requested = True
+
+
+def warm_up_host() -> str:
+    """Picks the Host header of the warm-up requests, which must pass the ``ALLOWED_HOSTS`` check.
+
+    Returns:
+        The first allowed host name, or "localhost" when any host or only local ones are allowed.
+    """
+    from django.conf import settings
+
+    for host in settings.ALLOWED_HOSTS:
+        # A leading dot allows the domain and its subdomains, a lone "*" allows any host.
+        host = host.lstrip(".")
+        if host and host != "*":
+            return host
+    return "localhost"
+
+
+async def warm_up(application, paths: Sequence[str]) -> bool:
+    """Requests the given paths from the ASGI application, so that imports, templates, caches and the database
+    connection are ready before the first real request.
+
+    Args:
+        application: The ASGI application.
+        paths: The paths to request.
+
+    Returns:
+        True if every path answered with a success or redirect status, otherwise False.
+    """
+    host = warm_up_host()
+    succeeded = True
+    for path in paths:
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        await application(
+            {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+                "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+                "headers": [(b"host", host.encode())], "client": ("127.0.0.1", 0), "server": (host, 80),
+            },
+            receive,
+            send
+        )
+        status = next((message["status"] for message in messages if message["type"] == "http.response.start"), None)
+        if status is not None and 200 <= status < 400:
+            logger.info("Warmed up %s (%s)", path, status)
+        else:
+            logger.warning("Warming up %s failed (%s), the first requests will do it", path, status)
+            succeeded = False
+    return succeeded
+
+
+def in_progress(connections: Mapping, websocket: bool) -> list:
+    """Lists the connections of a daphne server that a drain has to wait for.
+
+    HTTP connections count only while a request is in progress: idle keep-alive connections and finished requests
+    waiting for their connection to close are dropped when the worker stops.
+
+    Args:
+        connections: The protocols of the server mapped to their details.
+        websocket: Whether to list the open WebSocket connections instead of the HTTP requests.
+
+    Returns:
+        The protocols of the listed connections.
+    """
+    from daphne.ws_protocol import WebSocketProtocol
+    from twisted.web.http import Request
+
+    if websocket:
+        return [
+            protocol for protocol, details in connections.items()
+            if "disconnected" not in details and isinstance(protocol, WebSocketProtocol)
+        ]
+    return [
+        protocol for protocol, details in connections.items()
+        if "disconnected" not in details and isinstance(protocol, Request) and not protocol.finished
+    ]
+
+
+def run_worker(fd: int, ready_fd: int, warmup_paths: Sequence[str], graceful_timeout: int) -> None:
+    """Serves the ASGI application from an inherited listening socket until asked to drain.
+
+    Args:
+        fd: The file descriptor of the listening IPv4 socket.
+        ready_fd: The file descriptor to write to once the worker accepts connections.
+        warmup_paths: The paths to request before accepting connections.
+        graceful_timeout: The number of seconds to wait for in-flight requests when draining.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecommerce.settings")
+    with startup.timed("ecommerce.asgi"):
+        from ecommerce.asgi import application
+
+    with startup.timed("warm-up: requests"):
+        asyncio.run(warm_up(application, warmup_paths))
+    logger.info(
+        "Worker %s started in %s",
+        os.getpid(), ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in startup.timings.items())
+    )
+
+    # Importing daphne.server installs the asyncio reactor, which must happen in the worker itself.
+    from daphne.server import Server
+    from twisted.internet import reactor
+
+    class DrainingServer(Server):
+        """A daphne server that can stop accepting connections and exit once its connections are done."""
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.ports = []
+            self.draining = False
+
+        def listen_success(self, port):
+            self.ports.append(port)
+            super().listen_success(port)
+
+        def drain(self):
+            """Stops accepting connections, waits for the in-flight HTTP requests, then asks the WebSocket clients to
+            reconnect to another worker and stops."""
+            if self.draining:
+                return
+            self.draining = True
+            for port in self.ports:
+                port.stopListening()
+            self._wait_for_requests(time.monotonic() + graceful_timeout)
+
+        def _wait_for_requests(self, deadline: float):
+            if in_progress(self.connections, websocket=False) and time.monotonic() < deadline:
+                reactor.callLater(0.1, self._wait_for_requests, deadline)
+                return
+            for protocol in in_progress(self.connections, websocket=True):
+                protocol.serverClose(code=CLOSE_CODE_SERVICE_RESTART)
+            self._wait_for_websockets(time.monotonic() + 5)
+
+        def _wait_for_websockets(self, deadline: float):
+            if in_progress(self.connections, websocket=True) and time.monotonic() < deadline:
+                reactor.callLater(0.1, self._wait_for_websockets, deadline)
+                return
+            self.stop()
+
+    def ready():
+        os.write(ready_fd, b"1")
+        os.close(ready_fd)
+
+    server = DrainingServer(
+        application, endpoints=[f"fd:fileno={fd}"], signal_handlers=False, ready_callable=ready
+    )
+    signal.signal(signal.SIGTERM, lambda signum, frame: reactor.callFromThread(server.drain))
+    # Ctrl-C reaches the whole process group; the master turns it into a drain.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    server.run()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Entry point of the worker processes started by `WorkerPool`.
+
+    Args:
+        argv: The command line arguments. Defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fd", type=int, required=True)
+    parser.add_argument("--ready-fd", type=int, required=True)
+    parser.add_argument("--warmup-path", action="append", default=[])
+    parser.add_argument("--graceful-timeout", type=int, default=30)
+    arguments = parser.parse_args(argv)
+    run_worker(arguments.fd, arguments.ready_fd, arguments.warmup_path, arguments.graceful_timeout)
+
+
+if __name__ == "__main__":
+    main()
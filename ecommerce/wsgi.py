@@ -11,6 +11,12 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from ecommerce import startup
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings')
+# Serving processes warm up while the apps load and preload their caches afterwards, see `ecommerce.startup`.
+os.environ.setdefault('DJANGO_STARTUP_WARMUP', '1')
 
 application = get_wsgi_application()
+
+startup.preload_apps()
@@ -0,0 +1,56 @@
+from channels.db import database_sync_to_async
+
+from notifications.models import Connection, ConnectionCounter
+
+# Connections left behind by a crashed worker are forgotten after this many seconds.
+CONNECTIONS_TIMEOUT = 24 * 60 * 60
+
+# Counted events: accepted connections, connections closed for missing heartbeats and connections evicted by newer
+# connections of the same user.
+COUNTERS = ("connected", "reaped", "evicted")
+
+
+async def register(username: str, channel_name: str, limit: int) -> list[str]:
+    """Records a new connection of a user and picks the connections to evict to stay within the limit.
+
+    The connections are kept in the database, so the limit holds across every worker.
+
+    Args:
+        username: The username of the connected user.
+        channel_name: The channel name of the new connection.
+        limit: The maximum number of concurrent connections of a user.
+
+    Returns:
+        The channel names of the oldest connections to close, oldest first.
+    """
+    return await database_sync_to_async(Connection.objects.register)(
+        username, channel_name, limit, CONNECTIONS_TIMEOUT
+    )
+
+
+async def unregister(username: str, channel_name: str) -> None:
+    """Forgets a closed connection of a user.
+
+    Args:
+        username: The username of the connected user.
+        channel_name: The channel name of the closed connection.
+    """
+    await database_sync_to_async(Connection.objects.unregister)(channel_name)
+
+
+async def count(counter: str) -> None:
+    """Increments a connection counter shared by every worker.
+
+    Args:
+        counter: The name of the counter, one of `COUNTERS`.
+    """
+    await database_sync_to_async(ConnectionCounter.objects.increment)(counter)
+
+
+def get_counters() -> dict[str, int]:
+    """Returns the connection counters.
+
+    Returns:
+        A dictionary mapping each counter of `COUNTERS` to its value.
+    """
+    return ConnectionCounter.objects.read(COUNTERS)
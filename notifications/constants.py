@@ -1,3 +1,7 @@
 
 
 NOTIFICATIONS_GROUP_NAME_PREFIX = "notifications-group-"
+
+# Application-defined WebSocket close codes telling the client why the server closed the connection.
+CLOSE_CODE_IDLE = 4000
+CLOSE_CODE_EVICTED = 4001
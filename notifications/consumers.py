@@ -1,23 +1,46 @@
+import asyncio
 import json
+import time
+from typing import Optional
 
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
 
-from notifications import constants
+from notifications import connections, constants
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
-    """Class representing a WebSocket consumer for notifications."""
+    """Class representing a WebSocket consumer for notifications.
+
+    The consumer sends a ping every ``NOTIFICATIONS_HEARTBEAT_INTERVAL`` seconds and closes the connection when the
+    client has not answered for ``NOTIFICATIONS_IDLE_TIMEOUT`` seconds. A user keeps at most
+    ``NOTIFICATIONS_MAX_CONNECTIONS_PER_USER`` connections, the oldest ones being closed first.
+
+    """
+    group_name: Optional[str] = None
+    heartbeat: Optional[asyncio.Task] = None
+
     async def connect(self):
         """Method called when a client connects to the WebSocket."""
         if self.scope["user"].is_anonymous:
-            self.close()
+            await self.close()
             return
 
         self.group_name = constants.NOTIFICATIONS_GROUP_NAME_PREFIX + self.scope["user"].username
 
         await self.channel_layer.group_add(self.group_name, self.channel_name)
 
+        evicted = await connections.register(
+            self.scope["user"].username, self.channel_name, settings.NOTIFICATIONS_MAX_CONNECTIONS_PER_USER
+        )
+        for channel_name in evicted:
+            await self.channel_layer.send(channel_name, {"type": "connection.evict"})
+
         await self.accept()
+        await connections.count("connected")
+
+        self.last_seen = time.monotonic()
+        self.heartbeat = asyncio.create_task(self.send_heartbeats())
 
     async def disconnect(self, close_code):
         """Method called when a client disconnects from the WebSocket.
@@ -25,7 +48,16 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         Args:
             close_code: A code indicating the reason for the WebSocket connection closing.
         """
-        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        await self.leave()
+
+    async def receive(self, text_data=None, bytes_data=None):
+        """Method called when the client sends a message, which counts as a heartbeat.
+
+        Args:
+            text_data: The text message, a pong being ``{"type": "pong"}``.
+            bytes_data: The binary message.
+        """
+        self.last_seen = time.monotonic()
 
     async def notify(self, event):
         """Method to receive and send notifications to the WebSocket.
@@ -36,3 +68,46 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         message = event["message"]
 
         await self.send(text_data=json.dumps({"message": message}))
+
+    async def connection_evict(self, event):
+        """Method closing the connection when a newer connection of the same user exceeds the limit.
+
+        Args:
+            event: The eviction event.
+        """
+        await self.reclaim("evicted", constants.CLOSE_CODE_EVICTED)
+
+    async def send_heartbeats(self):
+        """Sends pings until the client stops answering, then closes the connection."""
+        interval = settings.NOTIFICATIONS_HEARTBEAT_INTERVAL
+        while True:
+            await asyncio.sleep(interval)
+            if time.monotonic() - self.last_seen > settings.NOTIFICATIONS_IDLE_TIMEOUT:
+                await self.reclaim("reaped", constants.CLOSE_CODE_IDLE)
+                return
+            await self.send(text_data=json.dumps({"type": "ping"}))
+
+    async def reclaim(self, counter: str, code: int):
+        """Leaves the notifications group and closes the connection.
+
+        The group is left right away rather than in `disconnect`, which a half-dead connection may never reach.
+
+        Args:
+            counter: The connection counter to increment.
+            code: The WebSocket close code.
+        """
+        if self.group_name is None:
+            return
+        await self.leave()
+        await connections.count(counter)
+        await self.close(code)
+
+    async def leave(self):
+        """Leaves the notifications group and forgets the connection, at most once."""
+        if self.heartbeat is not None and self.heartbeat is not asyncio.current_task():
+            self.heartbeat.cancel()
+        if self.group_name is None:
+            return
+        group_name, self.group_name = self.group_name, None
+        await self.channel_layer.group_discard(group_name, self.channel_name)
+        await connections.unregister(self.scope["user"].username, self.channel_name)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from notifications.connections import get_counters
+
+
+class Command(BaseCommand):
+    """Management command that prints the WebSocket connection counters."""
+    help = (
+        "Prints how many notification connections were accepted, closed for missing heartbeats and evicted by newer "
+        "connections of the same user. Counters are shared by the workers through the database."
+    )
+
+    def handle(self, *args, **options) -> None:
+        """Prints the counters."""
+        for counter, value in get_counters().items():
+            self.stdout.write(f"{counter}: {value}")
@@ -0,0 +1,2 @@
+from notifications.models.connection import Connection
+from notifications.models.connection_counter import ConnectionCounter
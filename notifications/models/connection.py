@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from profiles.models import UserProfile
+
+
+class ConnectionManager(models.Manager):
+    """A custom manager for the Connection model.
+
+    Connections live in the default database rather than in the cache, so that every worker enforces the same
+    per-user limit even when each process has its own in-memory cache.
+
+    """
+    def register(self, username: str, channel_name: str, limit: int, timeout: int) -> list[str]:
+        """Records a new connection of a user and forgets the oldest ones beyond the limit.
+
+        The user's row is locked while the connections are counted, so concurrent connections of the same user,
+        possibly in different workers, never exceed the limit.
+
+        Args:
+            username: The username of the connected user.
+            channel_name: The channel name of the new connection.
+            limit: The maximum number of concurrent connections of a user.
+            timeout: The number of seconds after which a connection left behind by a crashed worker is forgotten.
+
+        Returns:
+            The channel names of the connections to close, oldest first.
+        """
+        with transaction.atomic():
+            list(UserProfile.objects.select_for_update().filter(username=username).values_list("pk"))
+            connections = self.filter(username=username)
+            connections.filter(connected_at__lt=timezone.now() - timedelta(seconds=timeout)).delete()
+            self.create(username=username, channel_name=channel_name)
+            channel_names = list(connections.order_by("pk").values_list("channel_name", flat=True))
+            evicted = channel_names[:max(len(channel_names) - limit, 0)]
+            self.filter(channel_name__in=evicted).delete()
+        return evicted
+
+    def unregister(self, channel_name: str) -> None:
+        """Forgets a closed connection.
+
+        Args:
+            channel_name: The channel name of the closed connection.
+        """
+        self.filter(channel_name=channel_name).delete()
+
+
+class Connection(models.Model):
+    """Represents an open notifications WebSocket connection.
+
+    Attributes:
+        username: The username of the connected user.
+        channel_name: The channel name of the connection.
+        connected_at: The timestamp when the connection was accepted.
+    """
+    username: models.CharField = models.CharField(max_length=150, db_index=True)
+    channel_name: models.CharField = models.CharField(max_length=255, unique=True)
+    connected_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+
+    objects = ConnectionManager()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the connection.
+
+        Returns:
+            str: A string representation of the connection.
+        """
+        return f"{self.username}: {self.channel_name}"
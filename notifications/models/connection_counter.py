@@ -0,0 +1,54 @@
+from django.db import models
+from django.db.models import F
+
+
+class ConnectionCounterManager(models.Manager):
+    """A custom manager for the ConnectionCounter model.
+
+    Counters live in the default database rather than in the cache, so that every worker increments the same
+    counters and the management command reads them from its own process.
+
+    """
+    def increment(self, name: str) -> None:
+        """Increments a counter, creating it on first use.
+
+        Args:
+            name: The name of the counter.
+        """
+        if not self.filter(pk=name).update(value=F("value") + 1):
+            # Concurrent first increments all create the counter at zero, then every one of them counts.
+            self.bulk_create([self.model(name=name, value=0)], ignore_conflicts=True)
+            self.filter(pk=name).update(value=F("value") + 1)
+
+    def read(self, names: tuple[str, ...]) -> dict[str, int]:
+        """Reads counters with a single query.
+
+        Args:
+            names: The names of the counters.
+
+        Returns:
+            A dictionary mapping each name to the value of its counter, 0 for counters never incremented.
+        """
+        values = dict(self.filter(pk__in=names).values_list("name", "value"))
+        return {name: values.get(name, 0) for name in names}
+
+
+class ConnectionCounter(models.Model):
+    """Represents a counter of notification connection events shared by every worker.
+
+    Attributes:
+        name: The name of the counter.
+        value: The number of counted events.
+    """
+    name: models.CharField = models.CharField(max_length=32, primary_key=True)
+    value: models.PositiveBigIntegerField = models.PositiveBigIntegerField(default=0)
+
+    objects = ConnectionCounterManager()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the counter.
+
+        Returns:
+            str: A string representation of the counter.
+        """
+        return f"{self.name}: {self.value}"
@@ -0,0 +1,77 @@
+import json
+from io import StringIO
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+
+from notifications import constants
+from notifications.connections import get_counters
+from notifications.consumers import NotificationConsumer
+from notifications.models import Connection
+from profiles.models import UserProfile
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    NOTIFICATIONS_MAX_CONNECTIONS_PER_USER=2,
+)
+class NotificationConsumerTest(TransactionTestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create_user(username='testuser')
+
+    async def connect(self):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), '/ws/notifications/')
+        communicator.scope['user'] = self.user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_oldest_connection_is_evicted(self):
+        oldest, middle, newest = [await self.connect() for _ in range(3)]
+
+        self.assertEqual(
+            await oldest.receive_output(timeout=5), {'type': 'websocket.close', 'code': constants.CLOSE_CODE_EVICTED}
+        )
+        self.assertTrue(await middle.receive_nothing())
+        self.assertEqual(await database_sync_to_async(get_counters)(), {'connected': 3, 'reaped': 0, 'evicted': 1})
+
+        group = get_channel_layer().groups[constants.NOTIFICATIONS_GROUP_NAME_PREFIX + 'testuser']
+        self.assertEqual(len(group), 2)
+        self.assertEqual(await Connection.objects.filter(username='testuser').acount(), 2)
+        for communicator in (middle, newest):
+            await communicator.disconnect()
+        self.assertFalse(await Connection.objects.aexists())
+
+    def test_limit_and_counters_are_shared_through_the_database(self):
+        # Connections registered by other workers count towards the limit of the user.
+        for channel_name in ('worker-1', 'worker-2'):
+            self.assertEqual(Connection.objects.register('testuser', channel_name, limit=2, timeout=60), [])
+        self.assertEqual(Connection.objects.register('testuser', 'worker-3', limit=2, timeout=60), ['worker-1'])
+
+        Connection.objects.filter(channel_name='worker-2').update(connected_at='2000-01-01T00:00:00Z')
+        self.assertEqual(Connection.objects.register('testuser', 'worker-4', limit=2, timeout=60), [])
+        self.assertEqual(
+            list(Connection.objects.order_by('pk').values_list('channel_name', flat=True)), ['worker-3', 'worker-4']
+        )
+
+        stdout = StringIO()
+        call_command('notification_connections', stdout=stdout)
+        self.assertEqual(stdout.getvalue(), 'connected: 0\nreaped: 0\nevicted: 0\n')
+
+    @override_settings(NOTIFICATIONS_HEARTBEAT_INTERVAL=0.05, NOTIFICATIONS_IDLE_TIMEOUT=0.12)
+    async def test_idle_connection_is_reaped(self):
+        communicator = await self.connect()
+
+        self.assertEqual(json.loads(await communicator.receive_from()), {'type': 'ping'})
+        await communicator.send_to(text_data=json.dumps({'type': 'pong'}))
+        self.assertEqual(json.loads(await communicator.receive_from()), {'type': 'ping'})
+
+        output = await communicator.receive_output()
+        while output['type'] == 'websocket.send':
+            output = await communicator.receive_output()
+        self.assertEqual(output, {'type': 'websocket.close', 'code': constants.CLOSE_CODE_IDLE})
+        self.assertEqual((await database_sync_to_async(get_counters)())['reaped'], 1)
+        self.assertFalse(get_channel_layer().groups.get(constants.NOTIFICATIONS_GROUP_NAME_PREFIX + 'testuser'))
@@ -1,4 +1,11 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+from ecommerce import startup
+
+logger = logging.getLogger(__name__)
 
 
 class ProfilesConfig(AppConfig):
@@ -8,6 +15,23 @@ class ProfilesConfig(AppConfig):
         default_auto_field: A string representing the name of the field to use for the default auto primary key field.
         name: A string representing the name of the app.
 
+    Methods:
+        ready: Warms the app up if `STARTUP_WARMUP` is enabled.
+        warm_up: Compiles the templates of the app.
+
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'profiles'
+
+    def ready(self) -> None:
+        """Warms the app up if `STARTUP_WARMUP` is enabled."""
+        if settings.STARTUP_WARMUP:
+            with startup.timed("warm-up: profiles"):
+                self.warm_up()
+
+    def warm_up(self) -> None:
+        """Compiles the templates of the app, the login page being the landing page of anonymous users."""
+        try:
+            startup.warm_up_templates(["base.html", "profiles/login.html"])
+        except Exception as error:
+            logger.warning("Warming up the profiles app failed, the first requests will do it: %s", error)
@@ -4,6 +4,7 @@ from django.urls import reverse
 
 from profiles.models import UserProfile
 from profiles.views import LoginView
+from shopping.models import Item
 
 
 class LoginViewTestCase(TestCase):
@@ -29,6 +30,17 @@ class LoginViewTestCase(TestCase):
         view = LoginView()
         self.assertEqual(view.get_success_url(), reverse_lazy('shopping:purchase'))
 
+    def test_login_merges_cookie_cart(self):
+        in_stock = Item.objects.create(name='In Stock', price=10, stock=1)
+        sold_out = Item.objects.create(name='Sold Out', price=10, stock=1)
+        self.client.post(reverse('shopping:purchase'), data={'items': [in_stock.id, sold_out.id]})
+        Item.objects.filter(pk=sold_out.pk).update(reserved=1)
+
+        response = self.client.post(self.url, data={'username': 'testuser', 'password': 'testpass'})
+        self.assertRedirects(response, reverse_lazy('shopping:purchase'))
+        self.assertEqual(list(self.user.cart.items.all()), [in_stock])
+        self.assertEqual(response.cookies['cart'].value, '')
+
 
 class LogoutViewTestCase(TestCase):
     def setUp(self):
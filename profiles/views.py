@@ -1,15 +1,19 @@
 from typing import Union
 
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import (
     LoginView as DjangoLoginView, LogoutView as DjangoLogoutView
 )
-from django.http import HttpRequest, HttpResponsePermanentRedirect
+from django.contrib.auth.forms import AuthenticationForm
+from django.http import HttpRequest, HttpResponse, HttpResponsePermanentRedirect
 from django.shortcuts import redirect
 from django.template.response import TemplateResponse
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
 
+from shopping.cookie_cart import CookieCart
+
 
 class LoginView(DjangoLoginView):
     """A view that handles user authentication and login.
@@ -20,6 +24,7 @@ class LoginView(DjangoLoginView):
     Methods:
         get: A method that handles GET requests to the view. If the user is already authenticated,
              they will be redirected to the purchase page.
+        form_valid: A method that logs the user in and merges their cookie cart into their cart.
         get_success_url: A method that returns the URL to redirect to after a successful login.
 
     """
@@ -43,6 +48,29 @@ class LoginView(DjangoLoginView):
             return redirect("shopping:purchase")
         return super().get(request=request, args=args, kwargs=kwargs)
 
+    def form_valid(self, form: AuthenticationForm) -> HttpResponse:
+        """Logs the user in and merges the cart they built anonymously into their cart.
+
+        Items that went out of stock in the meantime are dropped from the cart.
+
+        Args:
+            form: The valid authentication form.
+
+        Returns:
+            A redirect to the success URL, deleting the cookie cart.
+
+        """
+        response = super().form_valid(form)
+        cookie_cart = CookieCart.from_request(self.request)
+        if cookie_cart.item_ids:
+            out_of_stock = cookie_cart.merge_into(self.request.user)
+            if out_of_stock:
+                messages.warning(
+                    self.request, f"No longer in stock: {', '.join(item.name for item in out_of_stock)}."
+                )
+            CookieCart.clear(response)
+        return response
+
     def get_success_url(self):
         """Returns the URL to redirect to after a successful login.
 
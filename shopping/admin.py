@@ -0,0 +1,93 @@
+from typing import Optional
+
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.db.models import QuerySet
+from django.http import HttpRequest
+from django.template.response import TemplateResponse
+
+from shopping import bulk_operations
+from shopping.forms.reprice import RepriceForm
+from shopping.models import Item
+from shopping.models.order import Order
+
+
+@admin.register(Item)
+class ItemAdmin(admin.ModelAdmin):
+    """Admin of the items, with actions recalling items from every cart and repricing them."""
+    list_display = ("name", "sku", "price", "stock", "reserved", "is_active")
+    list_filter = ("is_active",)
+    search_fields = ("name", "sku")
+    actions = ("recall_from_carts", "reprice")
+
+    @admin.action(description="Recall selected items from every cart")
+    def recall_from_carts(self, request: HttpRequest, queryset: QuerySet) -> None:
+        """Takes the selected items off sale, removes them from every cart and takes their units out of stock.
+
+        Args:
+            request: The request object.
+            queryset: The selected items.
+        """
+        for item in queryset:
+            result = bulk_operations.recall_item(item.pk)
+            self.message_user(
+                request,
+                f"Recalled {item.name} from {result.rows} cart(s) in {result.batches} batch(es), "
+                f"{result.elapsed:.1f}s.",
+                messages.SUCCESS,
+            )
+
+    @admin.action(description="Reprice selected items by a percentage")
+    def reprice(self, request: HttpRequest, queryset: QuerySet) -> Optional[TemplateResponse]:
+        """Asks for a percentage, then changes the prices of the selected items, which every open cart picks up.
+
+        Args:
+            request: The request object.
+            queryset: The selected items.
+
+        Returns:
+            The page asking for the percentage, or None once the items are repriced.
+        """
+        form = RepriceForm(request.POST if "apply" in request.POST else None)
+        if form.is_valid():
+            result = bulk_operations.reprice_items(
+                {pk: form.reprice(price) for pk, price in queryset.values_list("pk", "price")}
+            )
+            self.message_user(
+                request, f"Repriced {result.rows} item(s) in {result.batches} batch(es), {result.elapsed:.1f}s.",
+                messages.SUCCESS,
+            )
+            return None
+        return TemplateResponse(
+            request,
+            "admin/shopping/item/reprice.html",
+            self.admin_site.each_context(request) | {
+                "title": "Reprice items",
+                "opts": self.model._meta,
+                "form": form,
+                "items": queryset,
+                "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            },
+        )
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    """Admin of the orders, with an action cancelling orders."""
+    list_display = ("id", "user_profile", "total", "discount", "created_at", "cancelled_at")
+    list_filter = ("cancelled_at",)
+    actions = ("cancel",)
+
+    @admin.action(description="Cancel selected orders")
+    def cancel(self, request: HttpRequest, queryset: QuerySet) -> None:
+        """Cancels the selected orders and puts their items back in stock.
+
+        Args:
+            request: The request object.
+            queryset: The selected orders.
+        """
+        result = bulk_operations.cancel_orders(queryset.values_list("pk", flat=True))
+        self.message_user(
+            request, f"Cancelled {result.rows} order(s) in {result.batches} batch(es), {result.elapsed:.1f}s.",
+            messages.SUCCESS,
+        )
@@ -1,4 +1,11 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+from ecommerce import startup
+
+logger = logging.getLogger(__name__)
 
 
 class ShoppingConfig(AppConfig):
@@ -8,6 +15,58 @@ class ShoppingConfig(AppConfig):
         default_auto_field: A string representing the name of the field to use for the default auto primary key field.
         name: A string representing the name of the app.
 
+    Methods:
+        ready: Connects the signal receivers of the app and warms it up if `STARTUP_WARMUP` is enabled.
+        warm_up: Populates the URL resolvers and compiles the templates.
+        preload: Renders the catalog into the cache once Django is set up.
+
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'shopping'
+
+    def ready(self) -> None:
+        """Connects the signal receivers of the app and warms it up if `STARTUP_WARMUP` is enabled."""
+        import shopping.signals  # noqa: F401
+
+        if settings.STARTUP_WARMUP:
+            with startup.timed("warm-up: shopping"):
+                self.warm_up()
+
+    def warm_up(self) -> None:
+        """Populates the URL resolvers and compiles the templates.
+
+        Runs while Django is being set up, so it must not query the database, see `preload`. A failure is logged and
+        leaves the work to the first requests.
+        """
+        try:
+            startup.warm_up_urls()
+            startup.warm_up_templates(
+                ["shopping/cart_confirm.html", "shopping/order_list.html", "shopping/purchase.html"]
+            )
+        except Exception as error:
+            logger.warning("Warming up the shopping app failed, the first requests will do it: %s", error)
+
+    def preload(self) -> None:
+        """Renders the catalog into the cache, called by the entry points through `startup.preload_apps`.
+
+        The catalog fragment is rendered under the same key as the purchase page, so the first visitor of a new
+        process gets it from the cache. A failure, e.g. an unmigrated database, is logged and leaves the work to the
+        first requests.
+        """
+        from django.template.loader import render_to_string
+
+        from shopping.cache import get_catalog_version
+        from shopping.forms.purchase import PurchaseForm
+
+        try:
+            # There is no request to take a CSRF token from, "NOTPROVIDED" is the value Django uses in that case.
+            render_to_string(
+                "shopping/purchase.html",
+                {
+                    "purchase_form": PurchaseForm(),
+                    "catalog_version": get_catalog_version(),
+                    "csrf_token": "NOTPROVIDED",
+                },
+            )
+        except Exception as error:
+            logger.warning("Preloading the catalog failed, the first request will render it: %s", error)
@@ -0,0 +1,176 @@
+"""Set-based operations run by staff over many carts and orders.
+
+Every operation works through the rows in primary key order, one chunk per short transaction, with a handful of
+UPDATE and DELETE statements per chunk instead of one statement per row. Checkouts and cart changes therefore only
+ever wait for the current chunk, never for the whole operation.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Mapping, Optional
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Value, When
+from django.utils import timezone
+
+from shopping.cache import bump_catalog_version
+from shopping.models import AccountSummary, CartItem, Item
+from shopping.models.order import Order
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[["BatchResult"], None]
+
+
+@dataclass
+class BatchResult:
+    """Counters of a running bulk operation.
+
+    Attributes:
+        rows: The number of rows changed so far.
+        batches: The number of chunks committed so far.
+        started_at: The `time.perf_counter` value at which the operation started.
+    """
+    rows: int = 0
+    batches: int = 0
+    started_at: float = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        """Calculates the number of seconds since the operation started.
+
+        Returns:
+            float: The elapsed time.
+        """
+        return time.perf_counter() - self.started_at
+
+    def as_dict(self) -> dict[str, float]:
+        """Returns the counters in a JSON serialisable form.
+
+        Returns:
+            dict[str, float]: The rows, batches and elapsed seconds.
+        """
+        return {"rows": self.rows, "batches": self.batches, "seconds": round(self.elapsed, 3)}
+
+
+def _commit_batch(name: str, result: BatchResult, rows: int, progress: Optional[ProgressCallback]) -> None:
+    """Counts a committed chunk and reports the progress.
+
+    Args:
+        name: The name of the operation, used in the log.
+        result: The counters of the operation.
+        rows: The number of rows changed by the chunk.
+        progress: A callable receiving the counters after each chunk.
+    """
+    result.rows += rows
+    result.batches += 1
+    logger.info("%s: %s row(s) in %s batch(es), %.1fs", name, result.rows, result.batches, result.elapsed)
+    if progress is not None:
+        progress(result)
+
+
+def recall_item(item_id: int, batch_size: int = 10_000, progress: Optional[ProgressCallback] = None) -> BatchResult:
+    """Takes an item off sale, removes it from every cart and takes its units out of stock.
+
+    The item is taken off sale and its unreserved units withdrawn first, so that no cart can reserve or check it out
+    while the recall runs.
+
+    Args:
+        item_id: The ID of the recalled item.
+        batch_size: The maximum number of cart items deleted per transaction. Default is 10000.
+        progress: A callable receiving the counters after each chunk.
+
+    Returns:
+        The counters of the recall, the rows being the deleted cart items.
+    """
+    result = BatchResult(started_at=time.perf_counter())
+    Item.objects.filter(pk=item_id).update(is_active=False, stock=F("reserved"))
+    bump_catalog_version()
+    cart_items = CartItem.objects.filter(item_id=item_id)
+    last_pk = 0
+    while True:
+        # Walking the item index by primary key ranges keeps every chunk a single indexed DELETE.
+        upper = list(
+            cart_items.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[batch_size - 1:batch_size]
+        )
+        chunk = cart_items.filter(pk__gt=last_pk)
+        if upper:
+            chunk = chunk.filter(pk__lte=upper[0])
+        with transaction.atomic():
+            deleted, _ = chunk.delete()
+            if deleted and not Item.objects.withdraw(item_id, deleted):
+                logger.error(
+                    "Recall of item %s: removed %s cart item(s) holding more units than reserved", item_id, deleted
+                )
+        if deleted:
+            _commit_batch(f"Recall of item {item_id}", result, deleted, progress)
+        if not upper:
+            break
+        last_pk = upper[0]
+    return result
+
+
+def cancel_orders(
+    order_ids: Iterable[int], batch_size: int = 1000, progress: Optional[ProgressCallback] = None
+) -> BatchResult:
+    """Cancels orders, puts their items back in stock and discounts them from the account summaries.
+
+    Orders that are already cancelled are skipped, so running a cancellation twice is harmless.
+
+    Args:
+        order_ids: The IDs of the orders to cancel.
+        batch_size: The maximum number of orders cancelled per transaction. Default is 1000.
+        progress: A callable receiving the counters after each chunk.
+
+    Returns:
+        The counters of the cancellation, the rows being the cancelled orders.
+    """
+    result = BatchResult(started_at=time.perf_counter())
+    order_ids = sorted(set(order_ids))
+    for start in range(0, len(order_ids), batch_size):
+        with transaction.atomic():
+            cancelled = list(
+                Order.objects.select_for_update()
+                .filter(pk__in=order_ids[start:start + batch_size], cancelled_at__isnull=True)
+                .values_list("pk", flat=True)
+            )
+            if not cancelled:
+                continue
+            Order.objects.filter(pk__in=cancelled).update(cancelled_at=timezone.now())
+            Item.objects.restock(dict(
+                Order.items.through.objects.filter(order_id__in=cancelled)
+                .values("item_id").annotate(quantity=Count("pk")).values_list("item_id", "quantity")
+            ))
+            AccountSummary.objects.record_cancellations(cancelled)
+        _commit_batch("Cancellation of orders", result, len(cancelled), progress)
+    if result.rows:
+        bump_catalog_version()
+    return result
+
+
+def reprice_items(
+    prices: Mapping[int, int], batch_size: int = 1000, progress: Optional[ProgressCallback] = None
+) -> BatchResult:
+    """Sets new item prices, which every open cart picks up since carts are priced at the current prices.
+
+    Placed orders keep the totals recorded at checkout, so neither their cost nor the account summaries change.
+
+    Args:
+        prices: A mapping of item IDs to their new price in USD.
+        batch_size: The maximum number of items repriced per statement. Default is 1000.
+        progress: A callable receiving the counters after each chunk.
+
+    Returns:
+        The counters of the repricing, the rows being the repriced items.
+    """
+    result = BatchResult(started_at=time.perf_counter())
+    items = sorted(prices.items())
+    for start in range(0, len(items), batch_size):
+        chunk = dict(items[start:start + batch_size])
+        updated = Item.objects.filter(pk__in=chunk).update(
+            price=Case(*(When(pk=pk, then=Value(price)) for pk, price in chunk.items()))
+        )
+        _commit_batch("Repricing of items", result, updated, progress)
+    if result.rows:
+        bump_catalog_version()
+    return result
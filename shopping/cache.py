@@ -0,0 +1,37 @@
+from shopping.models import CacheVersion
+
+CATALOG_VERSION_KEY = "shopping:catalog-version"
+PROMOTIONS_VERSION_KEY = "shopping:promotions-version"
+
+
+def get_catalog_version() -> int:
+    """Returns the current catalog version used to key the cached catalog and order fragments.
+
+    The version is read from the database so that a change made by one worker invalidates the fragments cached by
+    every worker.
+
+    Returns:
+        An integer that changes whenever an item is created, changed or deleted.
+    """
+    return CacheVersion.objects.current(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version() -> None:
+    """Invalidates every cached fragment that depends on the catalog by moving to a new catalog version."""
+    CacheVersion.objects.bump(CATALOG_VERSION_KEY)
+
+
+def get_promotions_version() -> int:
+    """Returns the current promotions version used to reload the compiled promotions.
+
+    Like the catalog version, it is read from the database so that every worker sees a change.
+
+    Returns:
+        An integer that changes whenever a promotion is created, changed or deleted.
+    """
+    return CacheVersion.objects.current(PROMOTIONS_VERSION_KEY)
+
+
+def bump_promotions_version() -> None:
+    """Makes every process reload its compiled promotions on their next use."""
+    CacheVersion.objects.bump(PROMOTIONS_VERSION_KEY)
@@ -0,0 +1,184 @@
+import csv
+import gzip
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, TextIO
+
+from django.core.exceptions import ValidationError
+
+from shopping.cache import bump_catalog_version
+from shopping.models import Item
+
+# Feed columns written on existing items. The stock is only set when an item is created since it is owned by the
+# reservations afterwards.
+UPDATE_FIELDS = ["name", "price"]
+
+
+@dataclass
+class ImportStats:
+    """Counters of a running catalog import.
+
+    Attributes:
+        rows: The number of rows read from the feed.
+        imported: The number of items created or updated.
+        invalid: The number of rejected rows.
+        started_at: The `time.perf_counter` value at which the import started.
+    """
+    rows: int = 0
+    imported: int = 0
+    invalid: int = 0
+    started_at: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Calculates the number of rows read per second.
+
+        Returns:
+            float: The import throughput.
+        """
+        elapsed = time.perf_counter() - self.started_at
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+
+class MalformedRow(dict):
+    """An empty row standing for a feed line that could not be read as a row, rejected by `build_item`.
+
+    Attributes:
+        reason: Why the line was rejected.
+    """
+    def __init__(self, reason: str):
+        super().__init__()
+        self.reason = reason
+
+
+def _open(path: Path) -> TextIO:
+    """Opens a feed file as text, decompressing ``.gz`` files on the fly.
+
+    Args:
+        path: The path of the feed file.
+
+    Returns:
+        The opened text stream.
+    """
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return path.open("r", encoding="utf-8", newline="")
+
+
+def read_rows(path: Path) -> Iterator[dict[str, Any]]:
+    """Streams the rows of a CSV or NDJSON catalog feed one at a time.
+
+    The format is picked from the file extension, ``.csv`` or ``.ndjson``/``.jsonl``, optionally followed by ``.gz``.
+
+    Args:
+        path: The path of the feed file.
+
+    Yields:
+        One dictionary per row. Lines that are not a JSON object are yielded as `MalformedRow` so that they are
+        counted and reported as invalid rows.
+    """
+    suffixes = [suffix for suffix in path.suffixes if suffix != ".gz"]
+    with _open(path) as feed:
+        if suffixes and suffixes[-1] == ".csv":
+            yield from csv.DictReader(feed)
+            return
+        for line in feed:
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    yield MalformedRow("Malformed JSON.")
+                    continue
+                if isinstance(row, dict):
+                    yield row
+                else:
+                    yield MalformedRow(f"Expected a JSON object, got {type(row).__name__}.")
+
+
+def build_item(row: dict[str, Any]) -> Item:
+    """Validates a feed row and builds the corresponding unsaved item.
+
+    Args:
+        row: A feed row with the ``sku``, ``name``, ``price`` and optional ``stock`` columns.
+
+    Returns:
+        The unsaved item.
+
+    Raises:
+        ValidationError: If the row is malformed or a column is missing or invalid.
+    """
+    if isinstance(row, MalformedRow):
+        raise ValidationError(row.reason)
+    sku = str(row.get("sku") or "").strip()
+    name = str(row.get("name") or "").strip()
+    if not sku or len(sku) > 64:
+        raise ValidationError(f"Invalid sku {sku!r}.")
+    if not name or len(name) > 256:
+        raise ValidationError(f"Invalid name for sku {sku!r}.")
+    try:
+        price = int(row["price"])
+        stock = int(row.get("stock") or 0)
+    except (KeyError, TypeError, ValueError):
+        raise ValidationError(f"Invalid price or stock for sku {sku!r}.")
+    if price < 0 or stock < 0:
+        raise ValidationError(f"Negative price or stock for sku {sku!r}.")
+    return Item(sku=sku, name=name, price=price, stock=stock)
+
+
+def _upsert(batch: dict[str, Item]) -> int:
+    """Inserts or updates a batch of items with a single statement keyed on the SKU.
+
+    Args:
+        batch: The items of the batch by SKU.
+
+    Returns:
+        The number of items written.
+    """
+    Item.objects.bulk_create(batch.values(), update_conflicts=True, unique_fields=["sku"], update_fields=UPDATE_FIELDS)
+    return len(batch)
+
+
+def import_items(
+    rows: Iterable[dict[str, Any]],
+    batch_size: int = 1000,
+    on_progress: Optional[Callable[[ImportStats], None]] = None,
+    on_invalid: Optional[Callable[[int, ValidationError], None]] = None,
+    progress_every: int = 100_000,
+) -> ImportStats:
+    """Upserts the items of a feed in batches, holding at most one batch in memory.
+
+    The cached catalog is invalidated once at the end rather than once per item.
+
+    Args:
+        rows: The feed rows.
+        batch_size: The number of items written per statement. Default is 1000.
+        on_progress: Called with the running counters every `progress_every` rows.
+        on_invalid: Called with the row number and the error of every rejected row.
+        progress_every: The number of rows between two progress reports. Default is 100000.
+
+    Returns:
+        The final import counters.
+    """
+    stats = ImportStats(started_at=time.perf_counter())
+    batch: dict[str, Item] = {}  # Keyed on the SKU so that a batch never updates the same row twice.
+    for stats.rows, row in enumerate(rows, start=1):
+        try:
+            item = build_item(row)
+        except ValidationError as error:
+            stats.invalid += 1
+            if on_invalid:
+                on_invalid(stats.rows, error)
+        else:
+            batch[item.sku] = item
+            if len(batch) >= batch_size:
+                stats.imported += _upsert(batch)
+                batch = {}
+        if on_progress and stats.rows % progress_every == 0:
+            on_progress(stats)
+
+    if batch:
+        stats.imported += _upsert(batch)
+    bump_catalog_version()
+    return stats
@@ -0,0 +1,20 @@
+from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
+
+from shopping.models import AccountSummary
+
+
+def account_summary(request: HttpRequest) -> dict:
+    """Adds the order statistics of the authenticated user to the template context.
+
+    The summary is only loaded, with a single primary key read, when a template uses it.
+
+    Args:
+        request: The HTTP request.
+
+    Returns:
+        A dictionary holding the lazily loaded `account_summary`, empty for anonymous users.
+    """
+    if not request.user.is_authenticated:
+        return {}
+    return {"account_summary": SimpleLazyObject(lambda: AccountSummary.objects.for_user(request.user))}
@@ -0,0 +1,98 @@
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from profiles.models import UserProfile
+from shopping.models import Cart, Item
+from shopping.models.cart import EMPTY_CART, CartSnapshot
+
+
+class CookieCart:
+    """The cart of an anonymous user, held entirely in a signed cookie.
+
+    The cookie stores the dot-separated IDs of the items in the cart, so building the cart never writes to the
+    database. Items are reserved only when the cart is merged into the user's Cart on login.
+
+    Attributes:
+        cookie_name: The name of the cookie.
+        salt: The salt used to sign the cookie.
+        item_ids: The IDs of the items in the cart, in the order they were added.
+
+    """
+    cookie_name = "cart"
+    salt = "shopping.cookie-cart"
+
+    def __init__(self, item_ids: Optional[list[int]] = None):
+        self.item_ids = item_ids or []
+
+    @classmethod
+    def from_request(cls, request: HttpRequest) -> "CookieCart":
+        """Loads the cart from the request cookies, ignoring missing, tampered or expired cookies.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            The cookie cart of the request.
+        """
+        value = request.get_signed_cookie(
+            cls.cookie_name, default="", salt=cls.salt, max_age=settings.SHOPPING_COOKIE_CART_MAX_AGE
+        )
+        return cls([int(item_id) for item_id in value.split(".") if item_id.isdigit()])
+
+    def add(self, item_ids: Iterable[int]) -> None:
+        """Adds items to the cart, skipping the ones it already holds.
+
+        Args:
+            item_ids: The IDs of the items to add.
+        """
+        for item_id in item_ids:
+            if item_id not in self.item_ids:
+                self.item_ids.append(item_id)
+        del self.item_ids[settings.SHOPPING_COOKIE_CART_MAX_ITEMS:]
+
+    def snapshot(self) -> CartSnapshot:
+        """Loads the items of the cart with a single query.
+
+        Returns:
+            A CartSnapshot of the cart, or the empty cart if it holds no items.
+        """
+        if not self.item_ids:
+            return EMPTY_CART
+        items = Item.objects.in_bulk(self.item_ids)
+        return CartSnapshot(items=tuple(items[item_id] for item_id in self.item_ids if item_id in items))
+
+    def save(self, response: HttpResponse) -> None:
+        """Stores the cart in the response cookies.
+
+        Args:
+            response: The HTTP response object.
+        """
+        response.set_signed_cookie(
+            self.cookie_name, ".".join(map(str, self.item_ids)), salt=self.salt,
+            max_age=settings.SHOPPING_COOKIE_CART_MAX_AGE, httponly=True, samesite="Lax"
+        )
+
+    @classmethod
+    def clear(cls, response: HttpResponse) -> None:
+        """Deletes the cart cookie.
+
+        Args:
+            response: The HTTP response object.
+        """
+        response.delete_cookie(cls.cookie_name, samesite="Lax")
+
+    def merge_into(self, user: UserProfile) -> list[Item]:
+        """Reserves the items of the cart and adds them to the user's Cart with a single bulk insert.
+
+        Args:
+            user: The user who just logged in.
+
+        Returns:
+            The items that were dropped because they are out of stock.
+        """
+        if not self.item_ids:
+            return []
+        cart = Cart.objects.get_or_create_by_user(user)
+        return cart.add_items(Item.objects.filter(pk__in=self.item_ids), partial=True)
@@ -1,5 +1,8 @@
+from typing import Any
+
 from django import forms
 
+from ecommerce.routers import get_replica_alias
 from shopping.models import Item
 
 
@@ -7,7 +10,22 @@ class PurchaseForm(forms.Form):
     """A form for selecting items to purchase.
 
     Attributes:
-        items: A ModelMultipleChoiceField representing the items available for purchase.
+        items: A ModelMultipleChoiceField representing the items on sale. Items that are out of stock are rejected
+               when they are reserved, which keeps the rendered catalog cacheable. The catalog of an unbound form is
+               read from the replica, submitted items are validated against the default database.
 
     """
-    items = forms.ModelMultipleChoiceField(queryset=Item.objects.all(), widget=forms.CheckboxSelectMultiple())
+    items = forms.ModelMultipleChoiceField(
+        queryset=Item.objects.filter(is_active=True), widget=forms.CheckboxSelectMultiple()
+    )
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """Initializes the form, reading the catalog of an unbound form from the replica.
+
+        Args:
+            *args: The positional arguments of `forms.Form`.
+            **kwargs: The keyword arguments of `forms.Form`.
+        """
+        super().__init__(*args, **kwargs)
+        if not self.is_bound:
+            self.fields["items"].queryset = self.fields["items"].queryset.using(get_replica_alias())
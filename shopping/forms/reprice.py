@@ -0,0 +1,24 @@
+from django import forms
+
+
+class RepriceForm(forms.Form):
+    """A form for changing the price of items by a percentage, used by the admin action repricing items.
+
+    Attributes:
+        percentage: The change of the prices in percent, negative for a price cut.
+
+    """
+    percentage = forms.IntegerField(
+        min_value=-100, max_value=1000, help_text="Change of the prices in percent, negative for a price cut."
+    )
+
+    def reprice(self, price: int) -> int:
+        """Applies the percentage of the validated form to a price.
+
+        Args:
+            price: The current price in USD.
+
+        Returns:
+            int: The new price in USD, rounded to the nearest dollar.
+        """
+        return round(price * (100 + self.cleaned_data["percentage"]) / 100)
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from shopping.models import ItemNeighbour
+
+
+class Command(BaseCommand):
+    """Management command that rebuilds the "frequently bought together" table from the order history."""
+    help = "Rebuilds the top-K items frequently bought together with every item from the whole order history."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Adds the command line arguments of the command.
+
+        Args:
+            parser: The argument parser of the command.
+        """
+        parser.add_argument("--top-k", type=int, default=10, help="Number of neighbours kept per item.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Number of items rebuilt per transaction.")
+
+    def handle(self, *args, top_k: int, batch_size: int, **options) -> None:
+        """Rebuilds the table and reports the number of stored neighbours.
+
+        Args:
+            top_k: The number of neighbours kept per item.
+            batch_size: The number of items whose neighbours are replaced per transaction.
+        """
+        started_at = time.perf_counter()
+        stored = ItemNeighbour.objects.rebuild(top_k=top_k, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {stored} neighbour(s) in {time.perf_counter() - started_at:.2f}s."
+        ))
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from shopping.catalog_import import ImportStats, import_items, read_rows
+
+
+class Command(BaseCommand):
+    """Management command that streams a catalog feed into the Item table."""
+    help = (
+        "Creates or updates items from a CSV or NDJSON catalog feed (optionally gzipped) keyed on their SKU. "
+        "The feed is streamed, so files of any size are imported in constant memory."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Adds the command line arguments of the command.
+
+        Args:
+            parser: The argument parser of the command.
+        """
+        parser.add_argument("path", type=Path, help="Path of the .csv, .ndjson or .jsonl feed, optionally .gz.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Number of items written per statement.")
+        parser.add_argument(
+            "--progress-every", type=int, default=100_000, help="Number of rows between two progress reports."
+        )
+
+    def handle(self, *args, path: Path, batch_size: int, progress_every: int, **options) -> None:
+        """Imports the feed and reports the progress and the throughput.
+
+        Args:
+            path: The path of the feed.
+            batch_size: The number of items written per statement.
+            progress_every: The number of rows between two progress reports.
+
+        Raises:
+            CommandError: If the feed does not exist.
+        """
+        if not path.is_file():
+            raise CommandError(f"No such feed: {path}")
+
+        def report_progress(stats: ImportStats) -> None:
+            self.stdout.write(f"{stats.rows} rows read, {stats.invalid} invalid, {stats.throughput:.0f} rows/s")
+
+        def report_invalid(row_number: int, error: ValidationError) -> None:
+            self.stderr.write(f"Row {row_number}: {error.message}")
+
+        stats = import_items(
+            read_rows(path), batch_size=batch_size, on_progress=report_progress, on_invalid=report_invalid,
+            progress_every=progress_every
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats.imported} item(s) from {stats.rows} row(s), {stats.invalid} invalid, "
+            f"{stats.throughput:.0f} rows/s."
+        ))
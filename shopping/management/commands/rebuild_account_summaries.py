@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from shopping.models import AccountSummary
+
+
+class Command(BaseCommand):
+    """Management command that recomputes the account summaries from the order history."""
+    help = "Rebuilds the order count, lifetime spend and last order date of every user from the order history."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Adds the command line arguments of the command.
+
+        Args:
+            parser: The argument parser of the command.
+        """
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Number of users summarised per transaction."
+        )
+
+    def handle(self, *args, batch_size: int, **options) -> None:
+        """Rebuilds the summaries in batches.
+
+        Args:
+            batch_size: The number of users summarised per transaction.
+        """
+        summarised = AccountSummary.objects.rebuild(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the account summaries of {summarised} user(s)."))
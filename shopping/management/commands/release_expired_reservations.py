@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+from shopping.models import CartItem
+
+
+class Command(BaseCommand):
+    """Management command that removes stale items from carts and hands their reservations back to the stock."""
+    help = "Releases the stock reserved by items that have been sitting in carts for longer than the reservation TTL."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Adds the command line arguments of the command.
+
+        Args:
+            parser: The argument parser of the command.
+        """
+        parser.add_argument(
+            "--ttl", type=int, default=settings.SHOPPING_RESERVATION_TTL,
+            help="Reservation lifetime in seconds. Defaults to the SHOPPING_RESERVATION_TTL setting."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Maximum number of cart items released per transaction."
+        )
+
+    def handle(self, *args, ttl: int, batch_size: int, **options) -> None:
+        """Releases the expired reservations in batches.
+
+        Args:
+            ttl: The reservation lifetime in seconds.
+            batch_size: The maximum number of cart items released per transaction.
+        """
+        released = CartItem.objects.release_expired(timezone.now() - timedelta(seconds=ttl), batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Released {released} expired reservation(s)."))
@@ -0,0 +1,50 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from ecommerce.workers import WorkerPool
+
+
+class Command(BaseCommand):
+    """Management command that serves the ASGI application with several daphne workers sharing one socket."""
+    help = (
+        "Serves ecommerce.asgi.application with several worker processes accepting connections from one listening "
+        "socket. Send SIGHUP for a rolling reload and SIGTERM to drain and stop."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Adds the command line arguments of the command.
+
+        Args:
+            parser: The argument parser of the command.
+        """
+        parser.add_argument("--bind", default="127.0.0.1", help="IPv4 address to bind to. Default is 127.0.0.1.")
+        parser.add_argument("--port", type=int, default=8000, help="Port to bind to. Default is 8000.")
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help="Number of worker processes. Defaults to the number of CPUs."
+        )
+        parser.add_argument(
+            "--warmup-path", action="append", dest="warmup_paths",
+            help="Path each worker requests from itself before accepting connections, may be repeated. Default is /."
+        )
+        parser.add_argument(
+            "--graceful-timeout", type=int, default=30,
+            help="Seconds a draining worker waits for its in-flight requests. Default is 30."
+        )
+
+    def handle(
+        self, *args, bind: str, port: int, workers: int, warmup_paths: list[str], graceful_timeout: int, **options
+    ) -> None:
+        """Runs the workers until the command is stopped.
+
+        Args:
+            bind: The address to bind to.
+            port: The port to bind to.
+            workers: The number of worker processes.
+            warmup_paths: The paths each worker requests before accepting connections.
+            graceful_timeout: The number of seconds a draining worker waits for its in-flight requests.
+        """
+        pool = WorkerPool(bind, port, workers, warmup_paths or ["/"], graceful_timeout)
+        pool.run()
+        self.stdout.write(self.style.SUCCESS(f"Stopped after restarting {pool.restarts} crashed worker(s)."))
@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from ecommerce.startup import parse_importtime
+
+
+class Command(BaseCommand):
+    """Management command that reports where a new process spends its startup time."""
+    help = (
+        "Starts a fresh interpreter loading the ASGI application like a worker does and prints the duration of the "
+        "startup phases, the ready hook of every app and the slowest module imports."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Adds the command line arguments of the command.
+
+        Args:
+            parser: The argument parser of the command.
+        """
+        parser.add_argument(
+            "--limit", type=int, default=15, help="Number of modules and packages listed. Default is 15."
+        )
+        parser.add_argument(
+            "--no-warmup", action="store_false", dest="warmup", help="Profile the startup without the app warm-ups."
+        )
+
+    def handle(self, *args, limit: int, warmup: bool, **options) -> None:
+        """Profiles the startup of a fresh interpreter and prints the report.
+
+        Args:
+            limit: The number of modules and packages listed.
+            warmup: Whether the apps warm up while loading.
+        """
+        environment = os.environ | {"DJANGO_STARTUP_WARMUP": "1" if warmup else "0"}
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "from ecommerce.startup import profile_child; profile_child()"],
+            cwd=settings.BASE_DIR, env=environment, capture_output=True, text=True
+        )
+        if completed.returncode:
+            raise CommandError(f"The profiled interpreter failed:\n{completed.stderr[-2000:]}")
+
+        timings = json.loads(completed.stdout.splitlines()[-1])
+        imports = parse_importtime(completed.stderr.splitlines())
+
+        self.stdout.write("Startup phases:")
+        for phase, seconds in timings.items():
+            self.stdout.write(f"  {phase:<40} {seconds * 1000:9.1f} ms")
+
+        packages: dict[str, int] = {}
+        for module in imports:
+            package = module.module.partition(".")[0]
+            packages[package] = packages.get(package, 0) + module.self_us
+        self.stdout.write(f"Imports: {len(imports)} modules in {sum(packages.values()) / 1000:.1f} ms, by package:")
+        for package, self_us in sorted(packages.items(), key=lambda row: -row[1])[:limit]:
+            self.stdout.write(f"  {package:<40} {self_us / 1000:9.1f} ms")
+
+        self.stdout.write("Slowest modules (self / cumulative):")
+        for module in sorted(imports, key=lambda row: -row.self_us)[:limit]:
+            self.stdout.write(
+                f"  {module.module:<40} {module.self_us / 1000:9.1f} ms {module.cumulative_us / 1000:9.1f} ms"
+            )
@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+from shopping.models import Cart
+
+
+class Command(BaseCommand):
+    """Management command that deletes abandoned carts and hands their reservations back to the stock."""
+    help = "Deletes the carts that were not modified for longer than the cart TTL, in bounded batches."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Adds the command line arguments of the command.
+
+        Args:
+            parser: The argument parser of the command.
+        """
+        parser.add_argument(
+            "--ttl", type=int, default=settings.SHOPPING_CART_TTL,
+            help="Cart lifetime in seconds since its last modification. Defaults to the SHOPPING_CART_TTL setting."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Maximum number of carts deleted per transaction."
+        )
+
+    def handle(self, *args, ttl: int, batch_size: int, **options) -> None:
+        """Deletes the abandoned carts in batches and reports the reclaimed rows.
+
+        Args:
+            ttl: The cart lifetime in seconds.
+            batch_size: The maximum number of carts deleted per transaction.
+        """
+        started_at = time.perf_counter()
+        carts, cart_items = Cart.objects.sweep_abandoned(
+            timezone.now() - timedelta(seconds=ttl), batch_size=batch_size
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {carts} abandoned cart(s) and {cart_items} cart item(s) "
+            f"in {time.perf_counter() - started_at:.2f}s."
+        ))
@@ -0,0 +1,79 @@
+# Generated by Django 4.1.5 on 2026-10-19 06:13
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+import django.utils.timezone
+
+# Items had no stock before this migration. Each existing item gets this many units on top of the units already
+# sitting in carts, so that it stays available, and the cart rows become reservations, so that they can still be
+# checked out and released.
+BACKFILLED_STOCK = 100
+
+
+def backfill_stock(apps, schema_editor):
+    Item = apps.get_model("shopping", "Item")
+    CartItem = apps.get_model("shopping", "CartItem")
+    in_carts = Coalesce(
+        Subquery(
+            CartItem.objects.filter(item_id=OuterRef("pk")).order_by().values("item_id")
+            .annotate(count=Count("pk")).values("count")
+        ),
+        Value(0),
+    )
+    # The stock is raised first so that the reserved <= stock constraint holds after each statement.
+    Item.objects.update(stock=in_carts + BACKFILLED_STOCK)
+    Item.objects.update(reserved=in_carts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopping', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='reserved',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='stock',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='item',
+            constraint=models.CheckConstraint(check=models.Q(('reserved__lte', models.F('stock'))), name='item_reserved_lte_stock'),
+        ),
+        # The existing auto-created cart-item table becomes the explicit CartItem through model.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='CartItem',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('cart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='shopping.cart')),
+                        ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='shopping.item')),
+                    ],
+                    options={
+                        'db_table': 'shopping_cart_items',
+                        'unique_together': {('cart', 'item')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='cart',
+                    name='items',
+                    field=models.ManyToManyField(related_name='carts', through='shopping.CartItem', to='shopping.item'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='cartitem',
+            name='reserved_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_stock, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.1.5 on 2026-10-19 06:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopping', '0004_item_sku'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemNeighbour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField()),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='shopping.item')),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='shopping.item')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='itemneighbour',
+            index=models.Index(fields=['item', '-score'], name='item_neighbour_score_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='itemneighbour',
+            unique_together={('item', 'neighbour')},
+        ),
+    ]
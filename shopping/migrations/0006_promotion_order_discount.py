@@ -0,0 +1,35 @@
+# Generated by Django 4.1.5 on 2026-10-19 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopping', '0005_itemneighbour'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='discount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='Promotion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=256)),
+                ('kind', models.CharField(choices=[('percentage', 'Percentage off each item'), ('fixed', 'Fixed amount off each item'), ('buy_x_get_y', 'Buy X items, get the Y cheapest free'), ('threshold', 'Fixed amount off carts above a threshold')], max_length=16)),
+                ('value', models.PositiveIntegerField(default=0)),
+                ('buy_quantity', models.PositiveIntegerField(default=0)),
+                ('get_quantity', models.PositiveIntegerField(default=0)),
+                ('threshold', models.PositiveIntegerField(default=0)),
+                ('is_active', models.BooleanField(db_index=True, default=True)),
+                ('starts_at', models.DateTimeField(blank=True, null=True)),
+                ('ends_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('items', models.ManyToManyField(blank=True, related_name='promotions', to='shopping.item')),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.5 on 2026-10-19 06:43
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0001_initial'),
+        ('shopping', '0006_promotion_order_discount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountSummary',
+            fields=[
+                ('user_profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='account_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('lifetime_spend', models.IntegerField(default=0)),
+                ('last_order_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
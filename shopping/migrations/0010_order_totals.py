@@ -0,0 +1,42 @@
+# Generated by Django 4.1.5 on 2026-10-19 09:12
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+def backfill_totals(apps, schema_editor):
+    Order = apps.get_model("shopping", "Order")
+    OrderItem = Order.items.through
+    # Existing orders were priced at the current item prices, which is the best record of what was paid.
+    Order.objects.update(
+        subtotal=Coalesce(
+            Subquery(
+                OrderItem.objects.filter(order_id=OuterRef("pk")).order_by().values("order_id")
+                .annotate(subtotal=Sum("item__price")).values("subtotal")
+            ),
+            Value(0),
+        )
+    )
+    Order.objects.update(total=Greatest(F("subtotal") - F("discount"), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopping', '0009_cacheversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.5 on 2026-10-19 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopping', '0010_order_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.1.5 on 2026-10-19 10:05
+
+from django.db import migrations
+from django.db.models import Count, Max, Sum
+
+BATCH_SIZE = 1000
+
+
+def backfill_account_summaries(apps, schema_editor):
+    # Same grouped aggregation as AccountSummaryManager.rebuild, over the totals stored on the orders by 0010. Users
+    # who ordered before 0007 have no summary, and the ones who ordered since only count their newer orders.
+    Order = apps.get_model("shopping", "Order")
+    AccountSummary = apps.get_model("shopping", "AccountSummary")
+    orders = Order.objects.filter(cancelled_at__isnull=True)
+    rows = orders.order_by("user_profile_id").values("user_profile_id").annotate(
+        order_count=Count("pk"), spend=Sum("total"), last_order_at=Max("created_at")
+    )
+    AccountSummary.objects.exclude(user_profile_id__in=orders.values("user_profile_id")).delete()
+    summaries = [
+        AccountSummary(
+            user_profile_id=row["user_profile_id"],
+            order_count=row["order_count"],
+            lifetime_spend=row["spend"],
+            last_order_at=row["last_order_at"],
+        )
+        for row in rows
+    ]
+    for start in range(0, len(summaries), BATCH_SIZE):
+        AccountSummary.objects.bulk_create(
+            summaries[start:start + BATCH_SIZE],
+            update_conflicts=True,
+            unique_fields=["user_profile"],
+            update_fields=["order_count", "lifetime_spend", "last_order_at"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopping', '0011_item_is_active'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_account_summaries, migrations.RunPython.noop),
+    ]
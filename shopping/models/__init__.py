@@ -1,2 +1,7 @@
 from shopping.models.item import Item
 from shopping.models.cart import Cart
+from shopping.models.cart_item import CartItem
+from shopping.models.item_neighbour import ItemNeighbour
+from shopping.models.promotion import Promotion
+from shopping.models.account_summary import AccountSummary
+from shopping.models.cache_version import CacheVersion
@@ -0,0 +1,163 @@
+from datetime import datetime
+from typing import Iterable
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, F, Max, OuterRef, Subquery, Sum, When
+
+from profiles.models import UserProfile
+from shopping.models.order import Order
+
+
+class AccountSummaryManager(models.Manager):
+    """A custom manager for the AccountSummary model.
+
+    This manager provides methods for reading a user's summary, for counting new and cancelled orders in it and for
+    rebuilding the summaries from the order history.
+
+    """
+    def for_user(self, user: UserProfile) -> "AccountSummary":
+        """Loads a user's summary with a single primary key read, without creating it.
+
+        Args:
+            user: The user whose summary is loaded.
+
+        Returns:
+            The user's summary, or an unsaved empty summary if the user has never ordered.
+        """
+        try:
+            return self.get(pk=user.pk)
+        except self.model.DoesNotExist:
+            return self.model(user_profile=user)
+
+    def record_order(self, user: UserProfile, total: int, created_at: datetime) -> None:
+        """Counts a new order in a user's summary.
+
+        Must run in the transaction inserting the order, so that the summary never disagrees with the order history.
+
+        Args:
+            user: The user who placed the order.
+            total: The total cost of the order in USD.
+            created_at: The timestamp when the order was created.
+        """
+        changes = {"order_count": F("order_count") + 1, "lifetime_spend": F("lifetime_spend") + total}
+        if self.filter(pk=user.pk).update(last_order_at=created_at, **changes):
+            return
+        try:
+            with transaction.atomic():
+                self.create(user_profile=user, order_count=1, lifetime_spend=total, last_order_at=created_at)
+        except IntegrityError:
+            # A concurrent checkout of the same user created the summary first.
+            self.filter(pk=user.pk).update(last_order_at=created_at, **changes)
+
+    def record_cancellations(self, order_ids: Iterable[int]) -> None:
+        """Discounts cancelled orders from their users' summaries.
+
+        Subtracts the totals recorded on the orders at checkout, which `record_order` added, whatever the current item
+        prices, and moves the last order timestamp back to the latest order still standing, like `rebuild`. Must run
+        in the transaction cancelling the orders, after they were marked cancelled, with one UPDATE for all the
+        affected users.
+
+        Args:
+            order_ids: The IDs of the orders that were just cancelled.
+        """
+        totals = self._order_totals(Order.objects.filter(pk__in=order_ids))
+        if not totals:
+            return
+        self.filter(pk__in=totals).update(
+            order_count=Case(
+                *(When(pk=user_id, then=F("order_count") - row["order_count"]) for user_id, row in totals.items())
+            ),
+            lifetime_spend=Case(
+                *(When(pk=user_id, then=F("lifetime_spend") - row["spend"]) for user_id, row in totals.items())
+            ),
+            last_order_at=Subquery(
+                Order.objects.filter(user_profile_id=OuterRef("pk"), cancelled_at__isnull=True)
+                .order_by("-created_at").values("created_at")[:1]
+            ),
+        )
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """Recomputes the summary of every user from the order history, one batch of users per transaction.
+
+        Orders count with the total recorded at checkout, like `Order.total_cost`, so later price changes do not
+        change the summaries. Cancelled orders are not counted.
+
+        Args:
+            batch_size: The number of users summarised per transaction. Default is 1000.
+
+        Returns:
+            The number of users who have placed orders.
+        """
+        summarised = 0
+        last_pk = 0
+        while user_ids := list(
+            UserProfile.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:batch_size]
+        ):
+            last_pk = user_ids[-1]
+            with transaction.atomic():
+                # Checkouts of the batch wait for the rebuild, or the rebuild waits for them and sees their orders.
+                list(self.select_for_update().filter(user_profile_id__in=user_ids).values_list("pk"))
+                orders = self._order_totals(
+                    Order.objects.filter(user_profile_id__in=user_ids, cancelled_at__isnull=True)
+                )
+                self.filter(user_profile_id__in=user_ids).exclude(user_profile_id__in=orders).delete()
+                self.bulk_create(
+                    [
+                        self.model(
+                            user_profile_id=user_id,
+                            order_count=row["order_count"],
+                            lifetime_spend=row["spend"],
+                            last_order_at=row["last_order_at"],
+                        )
+                        for user_id, row in orders.items()
+                    ],
+                    update_conflicts=True,
+                    unique_fields=["user_profile"],
+                    update_fields=["order_count", "lifetime_spend", "last_order_at"],
+                )
+            summarised += len(orders)
+        return summarised
+
+    @staticmethod
+    def _order_totals(orders: models.QuerySet) -> dict[int, dict]:
+        """Aggregates the totals recorded at checkout per user with a single grouped query.
+
+        Args:
+            orders: The orders to aggregate.
+
+        Returns:
+            A mapping of user IDs to their order count, spend in USD and last order timestamp.
+        """
+        return {
+            row["user_profile_id"]: row
+            for row in orders.order_by().values("user_profile_id").annotate(
+                order_count=Count("pk"), spend=Sum("total"), last_order_at=Max("created_at")
+            )
+        }
+
+
+class AccountSummary(models.Model):
+    """Represents the order statistics of a user, kept up to date by the checkout.
+
+    Attributes:
+        user_profile: The user, also the primary key of the summary.
+        order_count: The number of orders placed by the user.
+        lifetime_spend: The total cost in USD of the orders placed by the user.
+        last_order_at: The timestamp when the user last placed an order.
+    """
+    user_profile: models.OneToOneField = models.OneToOneField(
+        UserProfile, on_delete=models.CASCADE, primary_key=True, related_name="account_summary"
+    )
+    order_count: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    lifetime_spend: models.IntegerField = models.IntegerField(default=0)
+    last_order_at: models.DateTimeField = models.DateTimeField(null=True, blank=True)
+
+    objects = AccountSummaryManager()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the account summary.
+
+        Returns:
+            str: A string representation of the account summary.
+        """
+        return f"{self.user_profile}: {self.order_count} order(s), {self.lifetime_spend}$"
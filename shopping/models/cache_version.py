@@ -0,0 +1,61 @@
+import time
+
+from django.db import models
+from django.db.models import F
+
+
+class CacheVersionManager(models.Manager):
+    """A custom manager for the CacheVersion model.
+
+    Versions live in the default database rather than in the cache, so that every process sees a bump right away
+    even when each process has its own in-memory cache.
+
+    """
+    def current(self, key: str) -> int:
+        """Returns the version stored under a key with a single primary key read.
+
+        A missing version, e.g. on a new database, is created from the clock so that data cached for an earlier
+        version is never reused.
+
+        Args:
+            key: The key of the version.
+
+        Returns:
+            The current version.
+        """
+        versions = self.values_list("version", flat=True)
+        try:
+            return versions.get(pk=key)
+        except self.model.DoesNotExist:
+            self.bulk_create([self.model(key=key, version=time.time_ns())], ignore_conflicts=True)
+            return versions.get(pk=key)
+
+    def bump(self, key: str) -> None:
+        """Moves the version stored under a key to a new value.
+
+        Args:
+            key: The key of the version.
+        """
+        if not self.filter(pk=key).update(version=F("version") + 1):
+            self.bulk_create([self.model(key=key, version=time.time_ns())], ignore_conflicts=True)
+
+
+class CacheVersion(models.Model):
+    """Represents a version keying cached data, moved to a new value whenever the data changes.
+
+    Attributes:
+        key: The name of the version.
+        version: The current version.
+    """
+    key: models.CharField = models.CharField(max_length=64, primary_key=True)
+    version: models.BigIntegerField = models.BigIntegerField()
+
+    objects = CacheVersionManager()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the cache version.
+
+        Returns:
+            str: A string representation of the cache version.
+        """
+        return f"{self.key}: {self.version}"
@@ -1,14 +1,49 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable
+
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 from profiles.models import UserProfile
 from shopping.models import Item
 
 
+@dataclass(frozen=True)
+class CartSnapshot:
+    """A read-only, fully loaded copy of a user's cart contents.
+
+    The default instance is the empty cart, which needs no database rows.
+
+    Attributes:
+        items: The items in the cart, in the order they were added.
+
+    Properties:
+        total_cost: An integer representing the total cost of all items in the cart.
+
+    """
+    items: tuple[Item, ...] = ()
+
+    @property
+    def total_cost(self) -> int:
+        """Calculates the total cost of all items in the cart without querying the database.
+
+        Returns:
+            An integer representing the total cost of all items in the cart.
+
+        """
+        return sum(item.price for item in self.items)
+
+
+EMPTY_CART = CartSnapshot()
+
+
 class CartManager(models.Manager):
     """A custom manager for the Cart model.
 
-    This manager provides a method for getting or creating a cart for a given user.
+    This manager provides methods for getting or creating a cart for a given user, for loading a snapshot of its
+    contents and for sweeping abandoned carts.
 
     """
     def get_or_create_by_user(self, user: UserProfile) -> "Cart":
@@ -27,20 +62,67 @@ class CartManager(models.Manager):
         except ObjectDoesNotExist:
             return self.create(user_profile=user)
 
+    def snapshot_by_user(self, user: UserProfile) -> CartSnapshot:
+        """Loads the contents of a user's cart with a single query, without creating a cart.
+
+        Args:
+            user: A UserProfile object representing the user whose cart is loaded.
+
+        Returns:
+            A CartSnapshot of the user's cart, or the empty cart if the user has none.
+
+        """
+        items = tuple(Item.objects.filter(cartitem__cart__user_profile=user).order_by("cartitem__pk"))
+        return CartSnapshot(items=items) if items else EMPTY_CART
+
+    def sweep_abandoned(self, modified_before: datetime, batch_size: int = 1000) -> tuple[int, int]:
+        """Deletes the carts that were not modified since the given time, releasing their reservations.
+
+        Carts are deleted in batches, each in its own short transaction. Carts locked by a concurrent request are
+        skipped and picked up by the next sweep.
+
+        Args:
+            modified_before: The oldest modification time of a cart that is kept.
+            batch_size: The maximum number of carts deleted per transaction. Default is 1000.
+
+        Returns:
+            A tuple of the number of deleted carts and the number of deleted cart items.
+        """
+        carts = cart_items = 0
+        while True:
+            with transaction.atomic():
+                cart_ids = list(
+                    self.select_for_update(skip_locked=True)
+                    .filter(updated_at__lt=modified_before)
+                    .order_by("pk")
+                    .values_list("pk", flat=True)[:batch_size]
+                )
+                if not cart_ids:
+                    return carts, cart_items
+                cart_items += self.model.items.through.objects.filter(cart_id__in=cart_ids).release()
+                carts += self.filter(pk__in=cart_ids).delete()[1].get(self.model._meta.label, 0)
+
 
 class Cart(models.Model):
     """A model representing a user's shopping cart.
 
     Attributes:
         user_profile: A ForeignKey field linking to the UserProfile model representing the user who owns the cart.
-        items: A ManyToManyField representing the items in the cart and their quantities.
+        items: A ManyToManyField representing the items reserved in the cart through the CartItem model.
+        updated_at: The timestamp when the cart contents were last modified.
 
     Properties:
         total_cost: An integer representing the total cost of all items in the cart.
 
+    Methods:
+        add_items: Reserves and adds items to the cart.
+        remove_item: Removes an item from the cart and releases its reservation.
+        touch: Marks the cart as modified.
+
     """
     user_profile: models.ForeignKey = models.OneToOneField(UserProfile, on_delete=models.CASCADE)
-    items: models.ManyToManyField = models.ManyToManyField(Item, related_name="carts")
+    items: models.ManyToManyField = models.ManyToManyField(Item, related_name="carts", through="shopping.CartItem")
+    updated_at: models.DateTimeField = models.DateTimeField(default=timezone.now, db_index=True)
 
     objects = CartManager()
 
@@ -54,6 +136,48 @@ class Cart(models.Model):
         """
         return self.items.aggregate(models.Sum("price"))["price__sum"] or 0
 
+    def add_items(self, items: Iterable[Item], partial: bool = False) -> list[Item]:
+        """Reserves one unit of each item and adds it to the cart with a single bulk insert.
+
+        Items already in the cart are skipped. The cart row is locked before its contents are read, so concurrent
+        additions of the same item to the same cart reserve it only once.
+
+        Args:
+            items: The items to add.
+            partial: Whether to add the items in stock when others are not. By default nothing is added unless every
+                     item could be reserved.
+
+        Returns:
+            The items that are out of stock, empty on success.
+        """
+        with transaction.atomic():
+            list(Cart.objects.select_for_update().filter(pk=self.pk).values_list("pk"))
+            in_cart = set(self.items.values_list("pk", flat=True))
+            to_be_added = [item for item in items if item.pk not in in_cart]
+            out_of_stock = [item for item in to_be_added if not Item.objects.reserve(item.pk)]
+            if out_of_stock and not partial:
+                transaction.set_rollback(True)
+                return out_of_stock
+            self.items.through.objects.bulk_create(
+                [self.items.through(cart=self, item=item) for item in to_be_added if item not in out_of_stock]
+            )
+            self.touch()
+        return out_of_stock
+
+    def remove_item(self, item_id: int) -> None:
+        """Removes an item from the cart and releases its reservation.
+
+        Args:
+            item_id: The ID of the item to remove.
+        """
+        self.items.through.objects.filter(cart=self, item_id=item_id).release()
+        self.touch()
+
+    def touch(self) -> None:
+        """Marks the cart as modified so that it is not swept as abandoned."""
+        self.updated_at = timezone.now()
+        Cart.objects.filter(pk=self.pk).update(updated_at=self.updated_at)
+
     def __str__(self) -> str:
         """Returns a string representation of the cart.
 
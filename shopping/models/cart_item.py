@@ -0,0 +1,91 @@
+import logging
+from datetime import datetime
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from shopping.models import Cart, Item
+
+logger = logging.getLogger(__name__)
+
+
+class CartItemQuerySet(models.QuerySet):
+    """A custom queryset for the CartItem model.
+
+    Deleting cart items through `release` hands their reservations back to the stock.
+
+    """
+    def expired(self, reserved_before: datetime) -> "CartItemQuerySet":
+        """Filters the cart items whose reservation is older than the given time.
+
+        Args:
+            reserved_before: The oldest reservation time that is still valid.
+
+        Returns:
+            A queryset of the expired cart items.
+        """
+        return self.filter(reserved_at__lt=reserved_before)
+
+    def release(self) -> int:
+        """Deletes the cart items and releases their reservations.
+
+        Returns:
+            The number of deleted cart items.
+        """
+        with transaction.atomic():
+            rows = list(self.select_for_update().values_list("pk", "item_id"))
+            if not rows:
+                return 0
+
+            quantities: dict[int, int] = {}
+            for _, item_id in rows:
+                quantities[item_id] = quantities.get(item_id, 0) + 1
+
+            deleted, _ = CartItem.objects.filter(pk__in=[pk for pk, _ in rows]).delete()
+            if not Item.objects.release(quantities):
+                logger.warning("Released cart items without a matching reservation, by item ID: %s", quantities)
+        return deleted
+
+    def release_expired(self, reserved_before: datetime, batch_size: int = 1000) -> int:
+        """Releases the expired reservations in batches, each in its own short transaction.
+
+        Args:
+            reserved_before: The oldest reservation time that is still valid.
+            batch_size: The maximum number of cart items released per transaction. Default is 1000.
+
+        Returns:
+            The total number of released cart items.
+        """
+        released = 0
+        while True:
+            batch = list(self.expired(reserved_before).order_by("pk").values_list("pk", flat=True)[:batch_size])
+            if not batch:
+                return released
+            released += self.filter(pk__in=batch).release()
+
+
+class CartItem(models.Model):
+    """Represents an item reserved in a user's shopping cart.
+
+    Attributes:
+        cart: The cart holding the item.
+        item: The reserved item.
+        reserved_at: The timestamp when the item was added to the cart.
+    """
+    cart: models.ForeignKey = models.ForeignKey(Cart, on_delete=models.CASCADE)
+    item: models.ForeignKey = models.ForeignKey(Item, on_delete=models.CASCADE)
+    reserved_at: models.DateTimeField = models.DateTimeField(default=timezone.now, db_index=True)
+
+    objects = CartItemQuerySet.as_manager()
+
+    class Meta:
+        db_table = "shopping_cart_items"
+        unique_together = [("cart", "item")]
+
+    def __str__(self) -> str:
+        """Returns a string representation of the cart item.
+
+        Returns:
+            str: A string representation of the cart item.
+        """
+        return f"{self.item} in {self.cart}"
@@ -1,17 +1,139 @@
+from collections import defaultdict
+from typing import Iterable, Mapping
+
 from django.db import models
+from django.db.models import Case, F, When
+
+
+class ItemQuerySet(models.QuerySet):
+    """A custom queryset for the Item model providing contention-safe stock operations.
+
+    Every operation is a single conditional UPDATE, so concurrent buyers of the same item never need a table lock and
+    the stock can never become negative.
+
+    """
+    def available(self) -> "ItemQuerySet":
+        """Filters the items on sale that have at least one unreserved unit in stock.
+
+        Returns:
+            A queryset of the available items.
+        """
+        return self.filter(is_active=True, stock__gt=F("reserved"))
+
+    def reserve(self, item_id: int, quantity: int = 1) -> bool:
+        """Reserves units of an item if it is on sale and enough unreserved units are in stock.
+
+        Args:
+            item_id: The ID of the item to reserve.
+            quantity: The number of units to reserve. Default is 1.
+
+        Returns:
+            True if the units were reserved, otherwise False.
+        """
+        return bool(
+            self.filter(pk=item_id, is_active=True, stock__gte=F("reserved") + quantity)
+            .update(reserved=F("reserved") + quantity)
+        )
+
+    def release(self, quantities: Mapping[int, int]) -> bool:
+        """Releases reserved units without taking them out of stock.
+
+        Items holding fewer reserved units than asked are left unchanged, so the counter never goes negative. Items
+        released by the same quantity share one conditional UPDATE.
+
+        Args:
+            quantities: A mapping of item IDs to the number of units to release.
+
+        Returns:
+            True if every item had enough reserved units, otherwise False.
+        """
+        item_ids_by_quantity: dict[int, list[int]] = defaultdict(list)
+        for item_id, quantity in quantities.items():
+            item_ids_by_quantity[quantity].append(item_id)
+        released = sum(
+            self.filter(pk__in=item_ids, reserved__gte=quantity).update(reserved=F("reserved") - quantity)
+            for quantity, item_ids in item_ids_by_quantity.items()
+        )
+        return released == len(quantities)
+
+    def restock(self, quantities: Mapping[int, int]) -> int:
+        """Puts sold units back in stock.
+
+        Args:
+            quantities: A mapping of item IDs to the number of units to put back.
+
+        Returns:
+            The number of updated items.
+        """
+        if not quantities:
+            return 0
+        return self.filter(pk__in=quantities).update(
+            stock=Case(*(When(pk=pk, then=F("stock") + quantity) for pk, quantity in quantities.items()))
+        )
+
+    def withdraw(self, item_id: int, quantity: int) -> bool:
+        """Takes reserved units out of stock without selling them, e.g. when recalling them from carts.
+
+        Args:
+            item_id: The ID of the item.
+            quantity: The number of reserved units to withdraw.
+
+        Returns:
+            True if the item had enough reserved units, otherwise False.
+        """
+        return bool(
+            self.filter(pk=item_id, reserved__gte=quantity).update(
+                stock=F("stock") - quantity, reserved=F("reserved") - quantity
+            )
+        )
+
+    def commit(self, item_ids: Iterable[int]) -> bool:
+        """Takes one reserved unit of each item out of stock.
+
+        Must be called inside a transaction, which the caller rolls back when False is returned.
+
+        Args:
+            item_ids: The IDs of the items being sold.
+
+        Returns:
+            True if every item is on sale and had a reserved unit in stock, otherwise False.
+        """
+        item_ids = set(item_ids)
+        if not item_ids:
+            return True
+        updated = self.filter(pk__in=item_ids, is_active=True, stock__gte=1, reserved__gte=1).update(
+            stock=F("stock") - 1, reserved=F("reserved") - 1
+        )
+        return updated == len(item_ids)
 
 
 class Item(models.Model):
     """Represents an item that can be purchased in the online store.
 
     Attributes:
+        sku: The unique stock keeping unit identifying the item in catalog feeds.
         name: The name of the item.
         price: The price of the item in USD.
+        stock: The number of units in stock, including the reserved ones.
+        reserved: The number of units reserved by carts but not yet sold.
+        is_active: Whether the item is on sale. Items taken off sale, e.g. recalled ones, can neither be reserved nor
+                   checked out.
 
     """
 
+    sku: models.CharField = models.CharField(max_length=64, unique=True, null=True, blank=True)
     name: models.CharField = models.CharField(max_length=256, blank=False, null=False)
     price: models.IntegerField = models.IntegerField(blank=False, null=False)
+    stock: models.PositiveIntegerField = models.PositiveIntegerField(default=0, null=False)
+    reserved: models.PositiveIntegerField = models.PositiveIntegerField(default=0, null=False)
+    is_active: models.BooleanField = models.BooleanField(default=True)
+
+    objects = ItemQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(check=models.Q(reserved__lte=F("stock")), name="item_reserved_lte_stock"),
+        ]
 
     def __str__(self) -> str:
         """Returns a string representation of the item, including its name and price.
@@ -0,0 +1,146 @@
+import heapq
+import itertools
+from typing import Collection, Iterator
+
+from django.db import connection, models, transaction
+from django.db.models import F
+
+from shopping.models import Item
+from shopping.models.order import Order
+
+
+class ItemNeighbourManager(models.Manager):
+    """A custom manager for the ItemNeighbour model.
+
+    This manager provides methods for rebuilding the "frequently bought together" table from the order history,
+    updating it incrementally when an order is placed and looking up the recommendations of a cart.
+
+    """
+    def _co_occurrences(self, first_id: int, last_id: int) -> Iterator[tuple[int, int, int]]:
+        """Streams the sparse item-item co-occurrences of a range of items, counted by the database.
+
+        Args:
+            first_id: The ID above which items are counted.
+            last_id: The highest ID of the counted items.
+
+        Yields:
+            Tuples of an item ID, a neighbour ID and the number of orders holding both, grouped by item ID.
+        """
+        order_items = Order.items.through._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT a.item_id, b.item_id, COUNT(*) FROM {order_items} a "
+                f"INNER JOIN {order_items} b ON a.order_id = b.order_id AND a.item_id <> b.item_id "
+                f"WHERE a.item_id > %s AND a.item_id <= %s "
+                f"GROUP BY a.item_id, b.item_id ORDER BY a.item_id",
+                [first_id, last_id]
+            )
+            while rows := cursor.fetchmany(1000):
+                yield from rows
+
+    def rebuild(self, top_k: int = 10, batch_size: int = 1000) -> int:
+        """Replaces the top-K neighbours of every item, computed from the whole order history.
+
+        The items are walked in primary key ranges and the neighbours of each range are replaced in their own short
+        transaction, so checkouts recording their orders only ever wait for one range instead of the whole rebuild.
+        Readers see either the previous or the new neighbours of an item, never a mix.
+
+        Args:
+            top_k: The number of neighbours kept per item. Default is 10.
+            batch_size: The number of items whose neighbours are replaced per transaction. Default is 1000.
+
+        Returns:
+            The number of stored neighbours.
+        """
+        stored = 0
+        last_id = 0
+        while item_ids := list(
+            Item.objects.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:batch_size]
+        ):
+            first_id, last_id = last_id, item_ids[-1]
+            # Counting outside of the transaction keeps the write lock to the DELETE and INSERT statements.
+            batch = [
+                self.model(item_id=item_id, neighbour_id=neighbour_id, score=score)
+                for item_id, pairs in itertools.groupby(
+                    self._co_occurrences(first_id, last_id), key=lambda pair: pair[0]
+                )
+                for _, neighbour_id, score in heapq.nlargest(top_k, pairs, key=lambda pair: (pair[2], -pair[1]))
+            ]
+            with transaction.atomic():
+                self.filter(item_id__gt=first_id, item_id__lte=last_id).delete()
+                self.bulk_create(batch, batch_size=1000)
+            stored += len(batch)
+        return stored
+
+    def record_order(self, item_ids: Collection[int]) -> None:
+        """Counts a new order in the co-occurrences of its items.
+
+        Pairs missing from the table are added with a score of 1, so an item may temporarily hold more than K
+        neighbours until the next rebuild trims it.
+
+        Args:
+            item_ids: The IDs of the ordered items.
+        """
+        item_ids = set(item_ids)
+        if len(item_ids) < 2:
+            return
+        with transaction.atomic():
+            self.bulk_create(
+                [
+                    self.model(item_id=item_id, neighbour_id=neighbour_id, score=0)
+                    for item_id, neighbour_id in itertools.permutations(item_ids, 2)
+                ],
+                ignore_conflicts=True
+            )
+            for item_id in item_ids:
+                self.filter(item_id=item_id, neighbour_id__in=item_ids - {item_id}).update(score=F("score") + 1)
+
+    def recommend(self, item_ids: Collection[int], limit: int = 5) -> list[Item]:
+        """Looks up the items most frequently bought together with the given items using a single indexed query.
+
+        Args:
+            item_ids: The IDs of the items in the cart.
+            limit: The maximum number of recommended items. Default is 5.
+
+        Returns:
+            The recommended items on sale, excluding the given ones, best first.
+        """
+        if not item_ids:
+            return []
+        neighbours = (
+            self.filter(item_id__in=item_ids, neighbour__is_active=True)
+            .exclude(neighbour_id__in=item_ids)
+            .select_related("neighbour")
+            .order_by("-score")[:limit * len(item_ids)]
+        )
+        recommendations: dict[int, Item] = {}
+        for neighbour in neighbours:
+            recommendations.setdefault(neighbour.neighbour_id, neighbour.neighbour)
+        return list(recommendations.values())[:limit]
+
+
+class ItemNeighbour(models.Model):
+    """Represents an item frequently bought together with another item.
+
+    Attributes:
+        item: The item.
+        neighbour: The item bought together with it.
+        score: The number of orders holding both items.
+    """
+    item: models.ForeignKey = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="neighbours")
+    neighbour: models.ForeignKey = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="+")
+    score: models.PositiveIntegerField = models.PositiveIntegerField()
+
+    objects = ItemNeighbourManager()
+
+    class Meta:
+        unique_together = [("item", "neighbour")]
+        indexes = [models.Index(fields=["item", "-score"], name="item_neighbour_score_idx")]
+
+    def __str__(self) -> str:
+        """Returns a string representation of the item neighbour.
+
+        Returns:
+            str: A string representation of the item neighbour.
+        """
+        return f"{self.neighbour} bought with {self.item} ({self.score})"
@@ -10,20 +10,30 @@ class Order(models.Model):
     Attributes:
         user_profile: The user who made the order.
         items: The items that were ordered.
+        subtotal: The price in USD of the items at checkout, before promotions.
+        discount: The discount in USD granted by promotions at checkout.
+        total: The price in USD paid at checkout, after promotions.
         created_at: The timestamp when the order was created.
+        cancelled_at: The timestamp when the order was cancelled, if it was.
     """
     user_profile: models.ForeignKey = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
     items: models.ManyToManyField = models.ManyToManyField(Item, related_name="orders")
+    subtotal: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    discount: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    total: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
     created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+    cancelled_at: models.DateTimeField = models.DateTimeField(null=True, blank=True)
 
     @property
     def total_cost(self) -> int:
-        """Calculates the total cost of the order.
+        """Returns the total cost of the order after promotions, as paid at checkout.
+
+        Later price changes of the items do not change it.
 
         Returns:
             int: The total cost in USD.
         """
-        return self.items.aggregate(models.Sum("price"))["price__sum"] or 0
+        return self.total
 
     def __str__(self) -> str:
         """Returns a string representation of the order.
@@ -0,0 +1,46 @@
+from django.db import models
+
+from shopping.models import Item
+
+
+class Promotion(models.Model):
+    """Represents a discount rule applied when pricing a cart.
+
+    Attributes:
+        name: The name of the promotion shown to the user.
+        kind: The kind of the promotion, see `Kind`.
+        items: The items the promotion applies to, all items when empty. Ignored by threshold promotions.
+        value: The discount, a percentage for percentage promotions and an amount in USD otherwise.
+        buy_quantity: The number of eligible items to buy for buy-X-get-Y promotions.
+        get_quantity: The number of cheapest eligible items that are free for buy-X-get-Y promotions.
+        threshold: The cart subtotal in USD from which a threshold promotion applies.
+        is_active: Whether the promotion is enabled.
+        starts_at: The optional timestamp from which the promotion applies.
+        ends_at: The optional timestamp until which the promotion applies.
+        updated_at: The timestamp when the promotion was last changed.
+    """
+    class Kind(models.TextChoices):
+        PERCENTAGE = "percentage", "Percentage off each item"
+        FIXED = "fixed", "Fixed amount off each item"
+        BUY_X_GET_Y = "buy_x_get_y", "Buy X items, get the Y cheapest free"
+        THRESHOLD = "threshold", "Fixed amount off carts above a threshold"
+
+    name: models.CharField = models.CharField(max_length=256)
+    kind: models.CharField = models.CharField(max_length=16, choices=Kind.choices)
+    items: models.ManyToManyField = models.ManyToManyField(Item, related_name="promotions", blank=True)
+    value: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    buy_quantity: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    get_quantity: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    threshold: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    is_active: models.BooleanField = models.BooleanField(default=True, db_index=True)
+    starts_at: models.DateTimeField = models.DateTimeField(null=True, blank=True)
+    ends_at: models.DateTimeField = models.DateTimeField(null=True, blank=True)
+    updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        """Returns a string representation of the promotion.
+
+        Returns:
+            str: A string representation of the promotion.
+        """
+        return self.name
@@ -0,0 +1,247 @@
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+from django.utils import timezone
+
+from shopping.cache import get_promotions_version
+from shopping.models import Item
+from shopping.models.promotion import Promotion
+
+Kind = Promotion.Kind
+
+_engine: Optional["PromotionEngine"] = None
+_engine_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A compiled promotion.
+
+    Attributes:
+        promotion_id: The ID of the promotion.
+        name: The name of the promotion.
+        kind: The kind of the promotion.
+        value: The percentage or the amount in USD of the discount.
+        buy_quantity: The number of eligible items to buy for buy-X-get-Y promotions.
+        get_quantity: The number of free items for buy-X-get-Y promotions.
+        threshold: The cart subtotal from which a threshold promotion applies.
+        starts_at: The optional timestamp from which the promotion applies.
+        ends_at: The optional timestamp until which the promotion applies.
+    """
+    promotion_id: int
+    name: str
+    kind: str
+    value: int = 0
+    buy_quantity: int = 0
+    get_quantity: int = 0
+    threshold: int = 0
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+
+    def is_live(self, now: datetime) -> bool:
+        """Tells whether the promotion applies at the given time.
+
+        Args:
+            now: The pricing time.
+
+        Returns:
+            True if the promotion applies, otherwise False.
+        """
+        return (self.starts_at is None or self.starts_at <= now) and (self.ends_at is None or now < self.ends_at)
+
+    def item_discount(self, price: int) -> int:
+        """Calculates the discount of a percentage or fixed promotion on an item.
+
+        Args:
+            price: The price of the item.
+
+        Returns:
+            The discount in USD, never more than the price.
+        """
+        if self.kind == Kind.PERCENTAGE:
+            return price * min(self.value, 100) // 100
+        return min(self.value, price)
+
+
+@dataclass(frozen=True)
+class CartPrice:
+    """The price of a cart after promotions.
+
+    Attributes:
+        subtotal: The total cost of the items before promotions.
+        discount: The total discount of the applied promotions.
+        applied: The names of the applied promotions.
+
+    Properties:
+        total: The amount to pay.
+    """
+    subtotal: int = 0
+    discount: int = 0
+    applied: tuple[str, ...] = ()
+
+    @property
+    def total(self) -> int:
+        """Calculates the amount to pay.
+
+        Returns:
+            An integer representing the amount to pay in USD.
+        """
+        return self.subtotal - self.discount
+
+
+class PromotionEngine:
+    """The active promotions compiled into lookup tables indexed by item ID.
+
+    Pricing a cart is a single pass over its items that only visits the promotions of those items, plus the few
+    promotions applying to every item, so its cost does not grow with the number of item-specific promotions.
+
+    Attributes:
+        version: The promotions version the engine was compiled from.
+
+    """
+    def __init__(self, rules: Iterable[tuple[Rule, Optional[frozenset[int]]]], version: int = 0):
+        """Compiles the rules into lookup tables.
+
+        Args:
+            rules: Pairs of a rule and the IDs of the items it applies to, None for every item.
+            version: The promotions version the rules were loaded from.
+        """
+        self.version = version
+        self._item_rules: dict[int, list[Rule]] = defaultdict(list)
+        self._global_item_rules: list[Rule] = []
+        self._bundle_rules: dict[Rule, Optional[frozenset[int]]] = {}
+        self._bundles_by_item: dict[int, list[Rule]] = defaultdict(list)
+        self._threshold_rules: list[Rule] = []
+
+        for rule, item_ids in rules:
+            if rule.kind == Kind.THRESHOLD:
+                self._threshold_rules.append(rule)
+            elif rule.kind == Kind.BUY_X_GET_Y:
+                if rule.buy_quantity and rule.get_quantity:
+                    self._bundle_rules[rule] = item_ids
+                    for item_id in item_ids or ():
+                        self._bundles_by_item[item_id].append(rule)
+            elif item_ids is None:
+                self._global_item_rules.append(rule)
+            else:
+                for item_id in item_ids:
+                    self._item_rules[item_id].append(rule)
+        self._threshold_rules.sort(key=lambda rule: rule.threshold)
+
+    @classmethod
+    def load(cls, version: int = 0) -> "PromotionEngine":
+        """Compiles the enabled promotions with two queries.
+
+        Args:
+            version: The promotions version being loaded.
+
+        Returns:
+            The compiled engine.
+        """
+        promotions = list(Promotion.objects.filter(is_active=True))
+        item_ids: dict[int, set[int]] = defaultdict(set)
+        for promotion_id, item_id in Promotion.items.through.objects.filter(
+            promotion__is_active=True
+        ).values_list("promotion_id", "item_id").iterator():
+            item_ids[promotion_id].add(item_id)
+
+        return cls(
+            (
+                (
+                    Rule(
+                        promotion_id=promotion.pk, name=promotion.name, kind=promotion.kind, value=promotion.value,
+                        buy_quantity=promotion.buy_quantity, get_quantity=promotion.get_quantity,
+                        threshold=promotion.threshold, starts_at=promotion.starts_at, ends_at=promotion.ends_at
+                    ),
+                    frozenset(item_ids[promotion.pk]) if promotion.pk in item_ids else None
+                )
+                for promotion in promotions
+            ),
+            version=version
+        )
+
+    def price(self, items: Iterable[Item], now: Optional[datetime] = None) -> CartPrice:
+        """Prices a cart without querying the database.
+
+        Each item gets the best of its percentage and fixed promotions. Buy-X-get-Y promotions then make the cheapest
+        items of every group of X + Y eligible items free, each item being free at most once. Finally the best
+        threshold promotion reached by the discounted subtotal is applied.
+
+        Args:
+            items: The items in the cart.
+            now: The pricing time. Defaults to the current time.
+
+        Returns:
+            The price of the cart.
+        """
+        now = now or timezone.now()
+        applied: dict[str, None] = {}
+        # Only the best live percentage and the best live fixed promotion applying to every item can win.
+        live_global_rules = [rule for rule in self._global_item_rules if rule.is_live(now)]
+        global_rules = [
+            max(rules, key=lambda rule: rule.value)
+            for kind in (Kind.PERCENTAGE, Kind.FIXED)
+            if (rules := [rule for rule in live_global_rules if rule.kind == kind])
+        ]
+
+        subtotal = 0
+        prices: list[int] = []
+        bundle_lines: dict[Rule, list[int]] = defaultdict(list)
+        for line, item in enumerate(items):
+            subtotal += item.price
+            best, best_rule = 0, None
+            for rule in (*self._item_rules.get(item.pk, ()), *global_rules):
+                if rule.is_live(now) and (discount := rule.item_discount(item.price)) > best:
+                    best, best_rule = discount, rule
+            if best_rule:
+                applied[best_rule.name] = None
+            prices.append(item.price - best)
+            for rule in self._bundles_by_item.get(item.pk, ()):
+                bundle_lines[rule].append(line)
+
+        for rule, item_ids in self._bundle_rules.items():
+            if item_ids is None:
+                bundle_lines[rule] = list(range(len(prices)))
+
+        for rule, lines in bundle_lines.items():
+            if not rule.is_live(now):
+                continue
+            group_size = rule.buy_quantity + rule.get_quantity
+            lines = sorted((line for line in lines if prices[line]), key=lambda line: -prices[line])
+            for start in range(0, len(lines) - group_size + 1, group_size):
+                for line in lines[start + rule.buy_quantity:start + group_size]:
+                    prices[line] = 0
+                applied[rule.name] = None
+
+        discounted = sum(prices)
+        threshold_rule = None
+        for rule in self._threshold_rules:
+            if rule.threshold > discounted:
+                break
+            if rule.is_live(now) and (threshold_rule is None or rule.value > threshold_rule.value):
+                threshold_rule = rule
+        threshold_discount = 0
+        if threshold_rule:
+            threshold_discount = min(threshold_rule.value, discounted)
+            applied[threshold_rule.name] = None
+
+        return CartPrice(subtotal=subtotal, discount=subtotal - discounted + threshold_discount, applied=tuple(applied))
+
+
+def get_promotion_engine() -> PromotionEngine:
+    """Returns the compiled promotions of this process, reloading them only when the promotions changed.
+
+    Returns:
+        The up to date promotion engine.
+    """
+    global _engine
+
+    version = get_promotions_version()
+    if _engine is None or _engine.version != version:
+        with _engine_lock:
+            if _engine is None or _engine.version != version:
+                _engine = PromotionEngine.load(version)
+    return _engine
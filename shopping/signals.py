@@ -0,0 +1,31 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from shopping.cache import bump_catalog_version, bump_promotions_version
+from shopping.models import Item
+from shopping.models.promotion import Promotion
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def invalidate_catalog_cache(sender: type[Item], **kwargs) -> None:
+    """Invalidates the cached catalog fragments whenever an item is saved or deleted.
+
+    Args:
+        sender: The Item model class.
+        **kwargs: The signal arguments.
+    """
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Promotion)
+@receiver(post_delete, sender=Promotion)
+@receiver(m2m_changed, sender=Promotion.items.through)
+def invalidate_promotions(sender: type, **kwargs) -> None:
+    """Makes every process reload its compiled promotions whenever a promotion or its items change.
+
+    Args:
+        sender: The Promotion model class or its items through model.
+        **kwargs: The signal arguments.
+    """
+    bump_promotions_version()
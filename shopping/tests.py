@@ -1,7 +1,27 @@
-from django.test import TestCase, Client
+import gzip
+import json
+import tempfile
+from unittest import mock
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
-from shopping.models import Cart, Item
+from shopping import bulk_operations
+from shopping.cache import CATALOG_VERSION_KEY, get_catalog_version
+from shopping.forms.purchase import PurchaseForm
+from shopping.models import AccountSummary, CacheVersion, Cart, CartItem, Item, ItemNeighbour, Promotion
+from shopping.models.order import Order
+from shopping.promotions import CartPrice, PromotionEngine, Rule, get_promotion_engine
+from shopping.throttling import _get_checkout_slots
 from profiles.models import UserProfile
 
 
@@ -19,8 +39,28 @@ class PurchaseViewTest(TestCase):
         self.assertTemplateUsed(response, 'shopping/purchase.html')
         self.assertEqual(response.context['purchase_form'].is_bound, False)
 
+    def test_purchase_view_get_cached_catalog(self):
+        cache.clear()
+        Item.objects.create(name='First Item', price=10, stock=1)
+        self.client.get(self.url)
+        with self.assertNumQueries(4):  # The session, the user, their account summary and the catalog version.
+            response = self.client.get(self.url)
+        self.assertContains(response, 'First Item')
+
+        Item.objects.create(name='Second Item', price=10, stock=1)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Second Item')
+
+    def test_catalog_version_is_shared_through_the_database(self):
+        version = get_catalog_version()
+        cache.clear()  # What another worker with its own in-memory cache would start from.
+        self.assertEqual(get_catalog_version(), version)
+
+        Item.objects.create(name='Item', price=10)
+        self.assertEqual(CacheVersion.objects.get(pk=CATALOG_VERSION_KEY).version, version + 1)
+
     def test_purchase_view_post_valid(self):
-        item = Item.objects.create(name='Test Item', price=10)
+        item = Item.objects.create(name='Test Item', price=10, stock=1)
         data = {
             'items': [item.id],
         }
@@ -37,4 +77,544 @@ class PurchaseViewTest(TestCase):
         self.assertEqual(response.context['purchase_form'].is_bound, True)
         self.assertFalse(response.context['purchase_form'].is_valid())
 
+    def test_purchase_view_post_reserves_stock(self):
+        item = Item.objects.create(name='Test Item', price=10, stock=1)
+        self.client.post(self.url, data={'items': [item.id]})
+        item.refresh_from_db()
+        self.assertEqual(item.reserved, 1)
+
+    def test_adding_an_item_twice_reserves_it_once(self):
+        item = Item.objects.create(name='Test Item', price=10, stock=2)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.cart.add_items([item]), [])
+        self.assertEqual(self.cart.add_items([item]), [])
+        item.refresh_from_db()
+        self.assertEqual((item.reserved, self.cart.items.count()), (1, 1))
+
+        # The contents are read once the transaction holds the cart, not before it started.
+        statements = [query['sql'] for query in queries.captured_queries]
+        transaction_start = next(i for i, sql in enumerate(statements) if sql.startswith('SAVEPOINT'))
+        contents_read = next(i for i, sql in enumerate(statements) if 'shopping_cart_items' in sql)
+        self.assertLess(transaction_start, contents_read)
+
+    def test_purchase_view_post_out_of_stock(self):
+        item = Item.objects.create(name='Test Item', price=10, stock=1, reserved=1)
+        response = self.client.post(self.url, data={'items': [item.id]})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['purchase_form'].is_valid())
+        self.assertFalse(self.cart.items.exists())
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class CartConfirmViewTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = UserProfile.objects.create_user(username='testuser', password='password')
+        self.client.login(username='testuser', password='password')
+        self.url = reverse('shopping:cart-confirm')
+        self.cart = Cart.objects.get_or_create_by_user(self.user)
+        self.item = Item.objects.create(name='Test Item', price=10, stock=2)
+        self.cart.add_items([self.item])
+
+    def test_cart_view_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['cart'].items), [self.item])
+        self.assertEqual(response.context['cart'].total_cost, 10)
+
+    def test_cart_view_get_does_not_create_cart(self):
+        UserProfile.objects.create_user(username='newuser', password='password')
+        self.client.login(username='newuser', password='password')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cart'].total_cost, 0)
+        self.assertFalse(Cart.objects.filter(user_profile__username='newuser').exists())
+
+    def test_checkout_takes_reserved_items_out_of_stock(self):
+        self.client.post(self.url)
+        self.item.refresh_from_db()
+        self.assertEqual((self.item.stock, self.item.reserved), (1, 0))
+        self.assertEqual(list(Order.objects.get(user_profile=self.user).items.all()), [self.item])
+        self.assertFalse(self.cart.items.exists())
+
+    def test_checkout_without_stock_is_rolled_back(self):
+        Item.objects.filter(pk=self.item.pk).update(stock=0, reserved=0)
+        response = self.client.post(self.url)
+        self.assertRedirects(response, self.url)
+        self.assertFalse(Order.objects.exists())
+        self.assertTrue(self.cart.items.exists())
+
+
+class ReleaseExpiredReservationsCommandTest(TestCase):
+    def test_releases_only_expired_reservations(self):
+        user = UserProfile.objects.create_user(username='testuser', password='password')
+        cart = Cart.objects.get_or_create_by_user(user)
+        stale = Item.objects.create(name='Stale', price=10, stock=1)
+        fresh = Item.objects.create(name='Fresh', price=10, stock=1)
+        cart.add_items([stale, fresh])
+        CartItem.objects.filter(item=stale).update(reserved_at=timezone.now() - timedelta(days=1))
+
+        call_command('release_expired_reservations', batch_size=1, stdout=StringIO())
+
+        self.assertEqual(list(cart.items.all()), [fresh])
+        stale.refresh_from_db()
+        self.assertEqual(stale.reserved, 0)
+
+    def test_releasing_unreserved_cart_items_is_reported(self):
+        user = UserProfile.objects.create_user(username='testuser', password='password')
+        cart = Cart.objects.get_or_create_by_user(user)
+        reserved, unreserved = Item.objects.create(name='A', price=10, stock=1), Item.objects.create(name='B', price=10)
+        cart.add_items([reserved])
+        CartItem.objects.create(cart=cart, item=unreserved)
+
+        with self.assertLogs('shopping.models.cart_item', 'WARNING'):
+            self.assertEqual(CartItem.objects.filter(cart=cart).release(), 2)
+
+        self.assertEqual(list(Item.objects.order_by('pk').values_list('reserved', flat=True)), [0, 0])
+
+
+class SweepAbandonedCartsCommandTest(TestCase):
+    def test_sweeps_only_abandoned_carts(self):
+        item = Item.objects.create(name='Test Item', price=10, stock=2)
+        abandoned = Cart.objects.get_or_create_by_user(UserProfile.objects.create_user(username='abandoned'))
+        active = Cart.objects.get_or_create_by_user(UserProfile.objects.create_user(username='active'))
+        abandoned.add_items([item])
+        active.add_items([item])
+        Cart.objects.filter(pk=abandoned.pk).update(updated_at=timezone.now() - timedelta(days=365))
+
+        stdout = StringIO()
+        call_command('sweep_abandoned_carts', batch_size=1, stdout=stdout)
+
+        self.assertEqual(list(Cart.objects.all()), [active])
+        item.refresh_from_db()
+        self.assertEqual(item.reserved, 1)
+        self.assertIn('Deleted 1 abandoned cart(s) and 1 cart item(s)', stdout.getvalue())
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class ThrottlingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = UserProfile.objects.create_user(username='testuser', password='password')
+        self.client.login(username='testuser', password='password')
+
+    @override_settings(SHOPPING_RATE_LIMITS={'add-to-cart': {'rate': 0.1, 'burst': 1}})
+    def test_rate_limit(self):
+        url = reverse('shopping:purchase')
+        self.assertEqual(self.client.post(url).status_code, 200)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '10')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(SHOPPING_CHECKOUT_CONCURRENCY=1)
+    def test_checkout_concurrency_limit(self):
+        slots = _get_checkout_slots(1)
+        slots.acquire()
+        try:
+            response = self.client.post(reverse('shopping:cart-confirm'))
+        finally:
+            slots.release()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.client.post(reverse('shopping:cart-confirm')).status_code, 302)
+
+
+class CookieCartTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.item = Item.objects.create(name='Test Item', price=10, stock=1)
+
+    def test_anonymous_purchase_uses_cookie_cart(self):
+        with self.assertNumQueries(2):  # The submitted items and their stock, nothing is written.
+            response = self.client.post(reverse('shopping:purchase'), data={'items': [self.item.id]})
+        self.assertRedirects(response, reverse('shopping:cart-confirm'))
+        self.assertFalse(Cart.objects.exists())
+
+        response = self.client.get(reverse('shopping:cart-confirm'))
+        self.assertEqual(list(response.context['cart'].items), [self.item])
+
+    def test_anonymous_checkout_requires_login(self):
+        response = self.client.post(reverse('shopping:cart-confirm'))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith(reverse('profiles:login')))
+
+    def test_tampered_cookie_is_ignored(self):
+        self.client.cookies['cart'] = str(self.item.id)
+        response = self.client.get(reverse('shopping:cart-confirm'))
+        self.assertEqual(response.context['cart'].total_cost, 0)
+
+
+class ImportCatalogCommandTest(TestCase):
+    def test_imports_csv_and_ndjson_feeds(self):
+        Item.objects.create(sku='SKU-1', name='Old Name', price=5, stock=3)
+        with tempfile.TemporaryDirectory() as directory:
+            csv_feed = Path(directory) / 'feed.csv'
+            csv_feed.write_text('sku,name,price,stock\nSKU-1,New Name,15,99\nSKU-2,Second,20,4\n,Missing SKU,1,1\n')
+            ndjson_feed = Path(directory) / 'feed.ndjson.gz'
+            with gzip.open(ndjson_feed, 'wt') as feed:
+                feed.write('{"sku": "SKU-3", "name": "Third", "price": 30}\nnot json\n[1, 2]\n"x"\n3\n')
+
+            stdout, stderr = StringIO(), StringIO()
+            call_command('import_catalog', str(csv_feed), batch_size=1, stdout=stdout, stderr=stderr)
+            call_command('import_catalog', str(ndjson_feed), stdout=stdout, stderr=stderr)
+
+        self.assertEqual(
+            list(Item.objects.order_by('sku').values_list('sku', 'name', 'price', 'stock')),
+            [('SKU-1', 'New Name', 15, 3), ('SKU-2', 'Second', 20, 4), ('SKU-3', 'Third', 30, 0)]
+        )
+        self.assertIn('Imported 2 item(s) from 3 row(s), 1 invalid', stdout.getvalue())
+        self.assertIn('Row 3: Invalid sku', stderr.getvalue())
+        self.assertIn('Imported 1 item(s) from 5 row(s), 4 invalid', stdout.getvalue())
+        self.assertIn('Row 2: Malformed JSON.', stderr.getvalue())
+        self.assertIn('Row 3: Expected a JSON object, got list.', stderr.getvalue())
+        self.assertIn('Row 5: Expected a JSON object, got int.', stderr.getvalue())
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class RecommendationsTest(TestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create_user(username='testuser', password='password')
+        self.items = [Item.objects.create(name=f'Item {i}', price=10, stock=10) for i in range(4)]
+        for basket in ([0, 1, 2], [0, 1], [0, 3]):
+            order = Order.objects.create(user_profile=self.user)
+            order.items.set([self.items[i] for i in basket])
+
+    def test_rebuild_keeps_top_k_neighbours(self):
+        stdout = StringIO()
+        call_command('build_recommendations', top_k=2, stdout=stdout)
+        self.assertEqual(ItemNeighbour.objects.recommend([self.items[0].pk]), [self.items[1], self.items[2]])
+        self.assertEqual(ItemNeighbour.objects.filter(item=self.items[0]).count(), 2)
+        self.assertIn('Stored 7 neighbour(s)', stdout.getvalue())
+
+    def test_rebuild_replaces_neighbours_range_by_range(self):
+        ItemNeighbour.objects.create(item=self.items[3], neighbour=self.items[1], score=99)
+        self.assertEqual(ItemNeighbour.objects.rebuild(top_k=2, batch_size=1), 7)
+        self.assertEqual(ItemNeighbour.objects.recommend([self.items[0].pk]), [self.items[1], self.items[2]])
+        self.assertEqual(ItemNeighbour.objects.recommend([self.items[3].pk]), [self.items[0]])
+
+    def test_failing_recommendations_do_not_fail_the_checkout(self):
+        self.client.login(username='testuser', password='password')
+        Cart.objects.get_or_create_by_user(self.user).add_items([self.items[2], self.items[3]])
+        with mock.patch.object(ItemNeighbour.objects, 'record_order', side_effect=DatabaseError('locked')):
+            with self.assertLogs('shopping.views', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('shopping:cart-confirm'))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Order.objects.filter(user_profile=self.user).count(), 4)
+
+    def test_checkout_updates_recommendations_and_cart_page_shows_them(self):
+        ItemNeighbour.objects.rebuild()
+        self.client.login(username='testuser', password='password')
+        Cart.objects.get_or_create_by_user(self.user).add_items([self.items[2], self.items[3]])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('shopping:cart-confirm'))
+        self.assertEqual(ItemNeighbour.objects.get(item=self.items[2], neighbour=self.items[3]).score, 1)
+
+        Cart.objects.get_or_create_by_user(self.user).add_items([self.items[3]])
+        response = self.client.get(reverse('shopping:cart-confirm'))
+        self.assertEqual(response.context['recommendations'], [self.items[0], self.items[2]])
+
+        bulk_operations.recall_item(self.items[0].pk)
+        self.assertEqual(ItemNeighbour.objects.recommend([self.items[3].pk]), [self.items[2]])
+
+
+class PromotionEngineTest(SimpleTestCase):
+    def setUp(self):
+        self.items = [Item(pk=i, name=f'Item {i}', price=i * 10) for i in range(1, 5)]
+
+    def price(self, *rules):
+        return PromotionEngine(rules).price(self.items)
+
+    def test_no_promotions(self):
+        self.assertEqual(self.price(), CartPrice(subtotal=100))
+
+    def test_best_item_discount_wins(self):
+        price = self.price(
+            (Rule(1, 'Ten percent', Promotion.Kind.PERCENTAGE, value=10), None),
+            (Rule(2, 'Five off item 4', Promotion.Kind.FIXED, value=5), frozenset({4})),
+        )
+        self.assertEqual(price.discount, 1 + 2 + 3 + 5)
+        self.assertEqual(price.applied, ('Ten percent', 'Five off item 4'))
+
+    def test_buy_x_get_y(self):
+        price = self.price((Rule(1, 'Buy 1 get 1', Promotion.Kind.BUY_X_GET_Y, buy_quantity=1, get_quantity=1), None))
+        self.assertEqual(price.discount, 10 + 30)
+
+    def test_threshold(self):
+        price = self.price(
+            (Rule(1, 'Small', Promotion.Kind.THRESHOLD, value=5, threshold=50), None),
+            (Rule(2, 'Large', Promotion.Kind.THRESHOLD, value=20, threshold=100), None),
+            (Rule(3, 'Too large', Promotion.Kind.THRESHOLD, value=50, threshold=101), None),
+        )
+        self.assertEqual((price.total, price.applied), (80, ('Large',)))
+
+    def test_expired_promotion(self):
+        yesterday = timezone.now() - timedelta(days=1)
+        price = self.price((Rule(1, 'Expired', Promotion.Kind.FIXED, value=5, ends_at=yesterday), None))
+        self.assertEqual(price.discount, 0)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class PromotionCheckoutTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cart_page_and_checkout_apply_promotions(self):
+        user = UserProfile.objects.create_user(username='testuser', password='password')
+        self.client.login(username='testuser', password='password')
+        item = Item.objects.create(name='Test Item', price=40, stock=1)
+        Cart.objects.get_or_create_by_user(user).add_items([item])
+        promotion = Promotion.objects.create(name='Quarter off', kind=Promotion.Kind.PERCENTAGE, value=25)
+        promotion.items.set([item])
+
+        response = self.client.get(reverse('shopping:cart-confirm'))
+        self.assertEqual(response.context['price'].total, 30)
+
+        self.client.post(reverse('shopping:cart-confirm'))
+        self.assertEqual(Order.objects.get(user_profile=user).total_cost, 30)
+
+        Item.objects.filter(pk=item.pk).update(price=100)
+        order = Order.objects.get(user_profile=user)
+        self.assertEqual((order.subtotal, order.discount, order.total_cost), (40, 10, 30))
+
+    def test_promotion_change_reaches_every_worker(self):
+        engine = get_promotion_engine()
+        cache.clear()  # Workers with their own in-memory cache still share the version.
+        self.assertIs(get_promotion_engine(), engine)
+
+        Promotion.objects.create(name='Ten off', kind=Promotion.Kind.FIXED, value=10)
+        self.assertEqual(get_promotion_engine().price([Item(pk=1, price=40)]).discount, 10)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class AccountSummaryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserProfile.objects.create_user(username='testuser', password='password')
+        self.client.login(username='testuser', password='password')
+        self.items = [Item.objects.create(name=f'Item {i}', price=10 * (i + 1), stock=10) for i in range(2)]
+
+    def checkout(self, *items):
+        Cart.objects.get_or_create_by_user(self.user).add_items(items)
+        self.client.post(reverse('shopping:cart-confirm'))
+
+    def test_checkout_updates_summary_shown_on_order_list(self):
+        self.checkout(*self.items)
+        self.checkout(self.items[0])
+
+        summary = AccountSummary.objects.get(pk=self.user.pk)
+        self.assertEqual((summary.order_count, summary.lifetime_spend), (2, 40))
+        self.assertEqual(summary.last_order_at, Order.objects.latest('created_at').created_at)
+
+        response = self.client.get(reverse('shopping:order-list'))
+        self.assertContains(response, '2 orders, 40$ spent')
+        self.assertContains(response, '40$ lifetime spend')
+
+    def test_rebuild_from_history(self):
+        other = UserProfile.objects.create_user(username='other')
+        order = Order.objects.create(user_profile=self.user, subtotal=30, discount=5, total=25)
+        order.items.set(self.items)
+        Item.objects.update(price=1000)
+        AccountSummary.objects.create(user_profile=other, order_count=3, lifetime_spend=100)
+
+        stdout = StringIO()
+        call_command('rebuild_account_summaries', batch_size=1, stdout=stdout)
+        summary = AccountSummary.objects.get(pk=self.user.pk)
+        self.assertEqual((summary.order_count, summary.lifetime_spend), (1, 25))
+        self.assertFalse(AccountSummary.objects.filter(pk=other.pk).exists())
+        self.assertIn('Rebuilt the account summaries of 1 user(s)', stdout.getvalue())
+
+    def test_cancellation_agrees_with_rebuild(self):
+        self.checkout(self.items[0])
+        self.checkout(self.items[1])
+        first, latest = Order.objects.order_by('created_at')
+        bulk_operations.cancel_orders([latest.pk])
+
+        summary = AccountSummary.objects.get(pk=self.user.pk)
+        self.assertEqual(
+            (summary.order_count, summary.lifetime_spend, summary.last_order_at), (1, 10, first.created_at)
+        )
+        AccountSummary.objects.rebuild()
+        rebuilt = AccountSummary.objects.get(pk=self.user.pk)
+        self.assertEqual(
+            (rebuilt.order_count, rebuilt.lifetime_spend, rebuilt.last_order_at),
+            (summary.order_count, summary.lifetime_spend, summary.last_order_at),
+        )
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class BulkOperationsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = UserProfile.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        self.users = [UserProfile.objects.create_user(username=f'user{i}') for i in range(5)]
+        self.recalled = Item.objects.create(name='Recalled', price=10, stock=10)
+        self.other = Item.objects.create(name='Other', price=20, stock=10)
+
+    def test_recall_item_from_every_cart_in_batches(self):
+        for user in self.users:
+            Cart.objects.get_or_create_by_user(user).add_items([self.recalled, self.other])
+        progress = []
+
+        def on_progress(result):
+            # Carts still holding the item can neither reserve nor check it out while the recall runs.
+            reserved = Item.objects.reserve(self.recalled.pk)
+            progress.append((result.rows, reserved, Item.objects.commit([self.recalled.pk])))
+
+        result = bulk_operations.recall_item(self.recalled.pk, batch_size=2, progress=on_progress)
+
+        self.assertEqual((result.rows, result.batches), (5, 3))
+        self.assertEqual(progress, [(2, False, False), (4, False, False), (5, False, False)])
+        self.assertNotIn(self.recalled, PurchaseForm().fields['items'].queryset)
+        self.assertFalse(CartItem.objects.filter(item=self.recalled).exists())
+        self.assertEqual(CartItem.objects.filter(item=self.other).count(), 5)
+        self.recalled.refresh_from_db()
+        self.assertEqual((self.recalled.stock, self.recalled.reserved), (0, 0))
+
+    def test_recall_reports_cart_items_without_reservation(self):
+        Cart.objects.get_or_create_by_user(self.users[0]).add_items([self.recalled])
+        CartItem.objects.create(cart=Cart.objects.get_or_create_by_user(self.users[1]), item=self.recalled)
+
+        with self.assertLogs('shopping.bulk_operations', 'ERROR'):
+            result = bulk_operations.recall_item(self.recalled.pk)
+        self.assertEqual(result.rows, 2)
+        self.assertFalse(CartItem.objects.filter(item=self.recalled).exists())
+
+    def test_cancel_orders_restocks_and_updates_summaries(self):
+        orders = []
+        for user in self.users[:3]:
+            order = Order.objects.create(user_profile=user, subtotal=30, discount=5, total=25)
+            order.items.set([self.recalled, self.other])
+            AccountSummary.objects.record_order(user, 25, order.created_at)
+            orders.append(order)
+        Item.objects.filter(pk__in=[self.recalled.pk, self.other.pk]).update(stock=7)
+        bulk_operations.reprice_items({self.recalled.pk: 50})
+
+        response = self.client.post(
+            reverse('shopping:staff-order-cancel'),
+            json.dumps({'order_ids': [order.pk for order in orders[:2]]}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.json()['rows'], 2)
+        self.assertEqual(bulk_operations.cancel_orders([orders[0].pk]).rows, 0)
+
+        self.assertEqual(Order.objects.filter(cancelled_at__isnull=False).count(), 2)
+        self.assertEqual(set(Item.objects.values_list('stock', flat=True)), {9})
+        summaries = AccountSummary.objects.in_bulk([user.pk for user in self.users[:3]])
+        self.assertEqual((summaries[self.users[0].pk].order_count, summaries[self.users[0].pk].lifetime_spend), (0, 0))
+        self.assertEqual((summaries[self.users[2].pk].order_count, summaries[self.users[2].pk].lifetime_spend), (1, 25))
+
+        AccountSummary.objects.rebuild()
+        self.assertFalse(AccountSummary.objects.filter(pk=self.users[0].pk).exists())
+
+    def test_reprice_items_through_the_staff_api(self):
+        Cart.objects.get_or_create_by_user(self.users[0]).add_items([self.recalled])
+        self.client.force_login(self.users[0])
+        self.client.post(reverse('shopping:cart-confirm'))
+        Cart.objects.get_or_create_by_user(self.users[1]).add_items([self.other])
+        self.client.force_login(self.staff)
+
+        response = self.client.post(
+            reverse('shopping:staff-item-reprice'),
+            json.dumps({'prices': {str(self.recalled.pk): 15, str(self.other.pk): 30}}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.json()['rows'], 2)
+        self.assertEqual(list(Item.objects.order_by('pk').values_list('price', flat=True)), [15, 30])
+        self.assertEqual(Order.objects.get(user_profile=self.users[0]).total_cost, 10)
+        self.assertEqual(AccountSummary.objects.for_user(self.users[0]).lifetime_spend, 10)
+        self.assertEqual(Cart.objects.snapshot_by_user(self.users[1]).total_cost, 30)
+
+        for url, body in [
+            ('shopping:staff-item-reprice', {}),
+            ('shopping:staff-item-reprice', {'prices': [15, 30]}),
+            ('shopping:staff-item-reprice', {'prices': 15}),
+            ('shopping:staff-order-cancel', {'order_ids': 1}),
+            ('shopping:staff-item-recall', [self.recalled.pk]),
+        ]:
+            with self.subTest(url=url, body=body):
+                response = self.client.post(reverse(url), json.dumps(body), content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_reprice_items_with_the_admin_action(self):
+        UserProfile.objects.create_superuser(username='admin', password='password')
+        self.client.login(username='admin', password='password')
+        url = reverse('admin:shopping_item_changelist')
+        selection = {'action': 'reprice', '_selected_action': [self.recalled.pk, self.other.pk]}
+
+        response = self.client.post(url, selection)
+        self.assertContains(response, 'name="percentage"')
+        response = self.client.post(url, selection | {'apply': 'Reprice', 'percentage': -25})
+        self.assertRedirects(response, url)
+        self.assertEqual(list(Item.objects.order_by('pk').values_list('price', flat=True)), [8, 15])
+
+    def test_staff_api_requires_staff(self):
+        UserProfile.objects.create_user(username='customer', password='password')
+        self.client.login(username='customer', password='password')
+        response = self.client.post(
+            reverse('shopping:staff-item-recall'), json.dumps({'item_id': self.recalled.pk}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Item.objects.get(pk=self.recalled.pk).stock, 10)
+
+
+class BackfillMigrationTest(TransactionTestCase):
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.migrate(target)
+        return executor.loader.project_state(target).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_cart_rows_become_reservations(self):
+        apps = self.migrate([('shopping', '0001_initial')])
+        user = apps.get_model('profiles', 'UserProfile').objects.create(username='testuser')
+        in_cart, other = [apps.get_model('shopping', 'Item').objects.create(name=name, price=10) for name in 'AB']
+        apps.get_model('shopping', 'Cart').objects.create(user_profile=user).items.add(in_cart)
+
+        apps = self.migrate([('shopping', '0002_item_stock_cartitem')])
+        items = apps.get_model('shopping', 'Item').objects.in_bulk()
+        self.assertEqual((items[in_cart.pk].stock, items[in_cart.pk].reserved), (101, 1))
+        self.assertEqual((items[other.pk].stock, items[other.pk].reserved), (100, 0))
+
+    def test_orders_get_totals_at_the_prices_of_the_time(self):
+        apps = self.migrate([('shopping', '0009_cacheversion')])
+        user = apps.get_model('profiles', 'UserProfile').objects.create(username='testuser')
+        items = [apps.get_model('shopping', 'Item').objects.create(name=name, price=10) for name in 'AB']
+        Order = apps.get_model('shopping', 'Order')
+        order, discounted, empty = [Order.objects.create(user_profile=user, discount=d) for d in (5, 30, 0)]
+        order.items.set(items)
+        discounted.items.set(items)
+
+        apps = self.migrate([('shopping', '0010_order_totals')])
+        orders = apps.get_model('shopping', 'Order').objects.in_bulk()
+        self.assertEqual((orders[order.pk].subtotal, orders[order.pk].total), (20, 15))
+        self.assertEqual((orders[discounted.pk].subtotal, orders[discounted.pk].total), (20, 0))
+        self.assertEqual((orders[empty.pk].subtotal, orders[empty.pk].total), (0, 0))
+
+    def test_account_summaries_are_backfilled_from_the_orders(self):
+        apps = self.migrate([('shopping', '0011_item_is_active')])
+        UserProfile = apps.get_model('profiles', 'UserProfile')
+        before, since, idle = [UserProfile.objects.create(username=name) for name in ('before', 'since', 'idle')]
+        Order = apps.get_model('shopping', 'Order')
+        for user, total in ((before, 25), (before, 15), (since, 10), (since, 30)):
+            Order.objects.create(user_profile=user, subtotal=total, total=total)
+        Order.objects.create(user_profile=since, subtotal=50, total=50, cancelled_at=timezone.now())
+        latest = Order.objects.filter(user_profile=since, cancelled_at__isnull=True).latest('created_at')
+        AccountSummary = apps.get_model('shopping', 'AccountSummary')
+        # Summaries created by checkouts after 0007 only counted the newer orders.
+        AccountSummary.objects.create(user_profile=since, order_count=1, lifetime_spend=30)
+        AccountSummary.objects.create(user_profile=idle, order_count=1, lifetime_spend=5)
 
+        apps = self.migrate([('shopping', '0012_backfill_account_summaries')])
+        summaries = apps.get_model('shopping', 'AccountSummary').objects.in_bulk()
+        self.assertEqual(set(summaries), {before.pk, since.pk})
+        self.assertEqual((summaries[before.pk].order_count, summaries[before.pk].lifetime_spend), (2, 40))
+        self.assertEqual(
+            (summaries[since.pk].order_count, summaries[since.pk].lifetime_spend, summaries[since.pk].last_order_at),
+            (2, 40, latest.created_at),
+        )
@@ -0,0 +1,163 @@
+import math
+import threading
+import time
+from functools import wraps
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+
+# Buckets used when the shared cache is unreachable, only limiting the requests served by this process.
+_local_buckets: dict[str, tuple[float, float]] = {}
+_local_buckets_lock = threading.Lock()
+
+# Checkout slots of this process, created on first use from the SHOPPING_CHECKOUT_CONCURRENCY setting.
+_checkout_slots: dict[int, threading.BoundedSemaphore] = {}
+_checkout_slots_lock = threading.Lock()
+
+
+class TokenBucket:
+    """A token bucket refilled at a constant rate and stored in Django's cache.
+
+    The read-modify-write of a bucket is not atomic across processes, so concurrent requests of the same user may
+    occasionally get one token too many. Buckets fall back to process memory while the cache is unavailable.
+
+    Attributes:
+        rate: The number of tokens added per second.
+        capacity: The maximum number of tokens, i.e. the allowed burst.
+
+    """
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+
+    def _refill(self, state: tuple[float, float], now: float) -> tuple[float, float]:
+        """Computes the bucket content after refilling it up to the given time.
+
+        Args:
+            state: The stored number of tokens and the time they were counted at.
+            now: The current time.
+
+        Returns:
+            The refilled number of tokens and the current time.
+        """
+        tokens, counted_at = state
+        return min(self.capacity, tokens + (now - counted_at) * self.rate), now
+
+    def consume(self, key: str) -> float:
+        """Takes one token from the bucket stored under the given key.
+
+        Args:
+            key: The cache key of the bucket.
+
+        Returns:
+            0 if a token was taken, otherwise the number of seconds until the next token is available.
+        """
+        now = time.time()
+        try:
+            tokens, now = self._refill(cache.get(key, (self.capacity, now)), now)
+            if tokens >= 1:
+                cache.set(key, (tokens - 1, now), timeout=math.ceil(self.capacity / self.rate) + 1)
+                return 0
+            return (1 - tokens) / self.rate
+        except Exception:
+            return self._consume_local(key)
+
+    def _consume_local(self, key: str) -> float:
+        """Takes one token from the in-process bucket stored under the given key.
+
+        Args:
+            key: The key of the bucket.
+
+        Returns:
+            0 if a token was taken, otherwise the number of seconds until the next token is available.
+        """
+        with _local_buckets_lock:
+            now = time.monotonic()
+            tokens, now = self._refill(_local_buckets.get(key, (self.capacity, now)), now)
+            if tokens >= 1:
+                _local_buckets[key] = (tokens - 1, now)
+                return 0
+            _local_buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+
+def _too_many_requests(retry_after: float, status: int = 429) -> HttpResponse:
+    """Builds a fast rejection response.
+
+    Args:
+        retry_after: The number of seconds after which the client may retry.
+        status: The HTTP status code. Default is 429.
+
+    Returns:
+        An HttpResponse with a ``Retry-After`` header.
+    """
+    response = HttpResponse("Too many requests, please try again shortly.", status=status)
+    response["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def rate_limit(route: str) -> Callable:
+    """Decorator limiting the requests of each user to a view with a token bucket.
+
+    The bucket of the route is configured by ``SHOPPING_RATE_LIMITS[route]``, a dictionary with the ``rate`` in
+    requests per second and the ``burst`` capacity. Routes without a configuration are not limited.
+
+    Args:
+        route: The name of the limited route.
+
+    Returns:
+        A view decorator answering 429 with ``Retry-After`` once the bucket of the user is empty.
+    """
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            limit = settings.SHOPPING_RATE_LIMITS.get(route)
+            if limit:
+                client = request.user.pk or request.META.get("REMOTE_ADDR")
+                retry_after = TokenBucket(limit["rate"], limit["burst"]).consume(f"rate-limit:{route}:{client}")
+                if retry_after:
+                    return _too_many_requests(retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _get_checkout_slots(concurrency: int) -> threading.BoundedSemaphore:
+    """Returns the semaphore bounding the concurrent checkouts of this process.
+
+    Args:
+        concurrency: The maximum number of concurrent checkouts.
+
+    Returns:
+        A semaphore with `concurrency` slots.
+    """
+    with _checkout_slots_lock:
+        if concurrency not in _checkout_slots:
+            _checkout_slots[concurrency] = threading.BoundedSemaphore(concurrency)
+        return _checkout_slots[concurrency]
+
+
+def concurrency_limit(view: Callable) -> Callable:
+    """Decorator bounding the number of requests a process serves concurrently by the view.
+
+    Requests beyond ``SHOPPING_CHECKOUT_CONCURRENCY`` are answered immediately with 503 and a ``Retry-After`` of
+    ``SHOPPING_CHECKOUT_RETRY_AFTER`` seconds instead of queueing, which keeps the latency of accepted requests bounded.
+
+    Args:
+        view: The view to limit.
+
+    Returns:
+        The decorated view.
+    """
+    @wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        slots = _get_checkout_slots(settings.SHOPPING_CHECKOUT_CONCURRENCY)
+        if not slots.acquire(blocking=False):
+            return _too_many_requests(settings.SHOPPING_CHECKOUT_RETRY_AFTER, status=503)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            slots.release()
+    return wrapper
@@ -1,11 +1,17 @@
 from django.urls import path
 
-from shopping.views import PurchaseView, CartConfirmView, CartItemRemoveView, OrderListView
+from shopping.views import (
+    PurchaseView, CartConfirmView, CartItemRemoveView, OrderListView, StaffItemRecallView, StaffOrderCancelView,
+    StaffItemRepriceView
+)
 
 app_name = "shopping"
 urlpatterns = [
     path("", PurchaseView.as_view(), name="purchase"),
     path("cart/confirm/", CartConfirmView.as_view(), name="cart-confirm"),
     path("cart/items/<int:item_id>/remove", CartItemRemoveView.as_view(), name="cart-item-remove"),
-    path("orders/", OrderListView.as_view(), name="order-list")
+    path("orders/", OrderListView.as_view(), name="order-list"),
+    path("staff/items/recall/", StaffItemRecallView.as_view(), name="staff-item-recall"),
+    path("staff/items/reprice/", StaffItemRepriceView.as_view(), name="staff-item-reprice"),
+    path("staff/orders/cancel/", StaffOrderCancelView.as_view(), name="staff-order-cancel"),
 ]
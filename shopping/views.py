@@ -1,43 +1,69 @@
+import json
+import logging
+from abc import ABC, abstractmethod
 from typing import Hashable, Any, Optional, Union
 
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.db import transaction
 from django.db.models import QuerySet
-from django.http import HttpResponse, HttpRequest, HttpResponsePermanentRedirect
+from django.http import HttpResponse, HttpRequest, HttpResponsePermanentRedirect, JsonResponse
 from django.shortcuts import render, redirect
-from django.template.response import TemplateResponse
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView, View, ListView
 
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-
-import notifications.constants
+from ecommerce.routers import get_replica_alias
+from shopping import bulk_operations
+from shopping.cache import get_catalog_version
+from shopping.cookie_cart import CookieCart
 from shopping.forms.purchase import PurchaseForm
-from shopping.models import Cart
+from shopping.models import AccountSummary, Cart, CartItem, Item, ItemNeighbour
 from shopping.models.order import Order
+from shopping.promotions import get_promotion_engine
+from shopping.throttling import concurrency_limit, rate_limit
 
+logger = logging.getLogger(__name__)
 
-@method_decorator(login_required, name='dispatch')
+
+def record_recommendations(item_ids: list[int]) -> None:
+    """Counts a placed order in the "frequently bought together" table.
+
+    Runs once the order has committed, so a failure, such as a lock timeout, is logged instead of answering the
+    already placed order with an error. The next rebuild of the table counts the order.
+
+    Args:
+        item_ids: The IDs of the ordered items.
+    """
+    try:
+        ItemNeighbour.objects.record_order(item_ids)
+    except Exception:
+        logger.exception("Failed to record the order of items %s in the recommendations", item_ids)
+
+
+@method_decorator(rate_limit("add-to-cart"), name='post')
 class PurchaseView(TemplateView):
     """Renders a purchase form and handles form submission for adding items to the user's cart.
 
-    Only accessible to authenticated users.
+    Anonymous users build a cookie cart that is merged into their cart when they log in.
 
     Attributes:
         template_name: The name of the HTML template used to render the purchase form.
 
     Methods:
-        get_context_data(**kwargs): Overrides the parent method to add a `PurchaseForm` instance to the context.
+        get_context_data(**kwargs): Overrides the parent method to add a `PurchaseForm` instance and the catalog
+        version keying the cached catalog fragment to the context.
 
         post(request: HttpRequest) -> Union[HttpResponse, HttpResponsePermanentRedirect]: Handles form submission,
-        adds the selected items to the user's cart, and redirects to the cart confirmation page on success.
+        reserves the selected items in the user's cart, or adds them to the cookie cart of an anonymous user, and
+        redirects to the cart confirmation page on success.
 
     """
     template_name = "shopping/purchase.html"
 
     def get_context_data(self, **kwargs) -> dict[Hashable, Any]:
-        """Overrides the parent method to add a `PurchaseForm` instance to the context.
+        """Overrides the parent method to add a `PurchaseForm` instance and the catalog version to the context.
 
         Args:
             **kwargs: Arbitrary keyword arguments.
@@ -46,87 +72,136 @@ class PurchaseView(TemplateView):
             dict[Hashable, Any]: The updated context.
         """
         context = super(PurchaseView, self).get_context_data(**kwargs)
-        return context | {"purchase_form": PurchaseForm()}
+        return context | {"purchase_form": PurchaseForm(), "catalog_version": get_catalog_version()}
 
     def post(self, request: HttpRequest) -> Union[HttpResponse, HttpResponsePermanentRedirect]:
-        """Handles form submission, adds the selected items to the user's cart, and redirects to the cart
+        """Handles form submission, reserves the selected items in the user's cart, and redirects to the cart
            confirmation page on success.
 
+        Anonymous users get the items added to their cookie cart without any database write.
+
         Args:
             request: The HTTP request object.
 
         Returns:
             Union[HttpResponse, HttpResponsePermanentRedirect]: A redirect to the cart confirmation page on success
-                                                                or a rendered purchase form on error.
+                                                                or a rendered purchase form on error or when an
+                                                                item is out of stock.
         """
         purchase_form = PurchaseForm(request.POST)
 
-        if not purchase_form.is_valid():
-            return render(
-                request=request,
-                context={
-                    "purchase_form": purchase_form
-                },
-                template_name=self.template_name
+        if purchase_form.is_valid():
+            items = purchase_form.cleaned_data["items"]
+            response = redirect("shopping:cart-confirm")
+            if request.user.is_authenticated:
+                out_of_stock = Cart.objects.get_or_create_by_user(request.user).add_items(items)
+            else:
+                # Anonymous carts live in a signed cookie, the stock is only checked and reserved on login.
+                available = set(items.available().values_list("pk", flat=True))
+                out_of_stock = [item for item in items if item.pk not in available]
+                cookie_cart = CookieCart.from_request(request)
+                cookie_cart.add(item.pk for item in items)
+                cookie_cart.save(response)
+
+            if not out_of_stock:
+                return response
+            purchase_form.add_error(
+                "items", f"Out of stock: {', '.join(item.name for item in out_of_stock)}."
             )
 
-        cart = Cart.objects.get_or_create_by_user(request.user)
-        to_be_added = [
-            cart.items.through(cart=cart, item=item)
-            for item in purchase_form.cleaned_data["items"]
-            if item not in cart.items.all()
-        ]
-        cart.items.through.objects.bulk_create(to_be_added)
-
-        return redirect("shopping:cart-confirm")
+        return render(
+            request=request,
+            context={
+                "purchase_form": purchase_form
+            },
+            template_name=self.template_name
+        )
 
 
-@method_decorator(login_required, name='dispatch')
+@method_decorator([login_required, rate_limit("checkout"), concurrency_limit], name='post')
 class CartConfirmView(TemplateView):
     """View class that handles the cart confirmation process for a user.
 
+    Anonymous users see their cookie cart and are asked to log in to checkout.
+
     Attributes:
         template_name: The name of the HTML template that the view should render.
 
     Methods:
-        get(request, *args, **kwargs): Ensure to initialize a cart for the user.
-        post(request): Process payment, create a new order, flush the cart, and send a notification to the user.
+        get_context_data(**kwargs): Adds a snapshot of the user's cart, its price after promotions and the items
+                                    frequently bought together with its items to the context without creating a cart.
+        post(request): Process payment, take the reserved items out of stock, create a new order with the promotion
+                       discount, flush the cart, and send a notification to the user.
 
     """
     template_name = "shopping/cart_confirm.html"
 
-    def get(self, request: HttpRequest, *args, **kwargs) -> TemplateResponse:
-        """Ensure to initialize a cart for the user.
+    def get_context_data(self, **kwargs) -> dict[Hashable, Any]:
+        """Overrides the parent method to add a snapshot of the user's cart, its price and its recommendations to the
+           context.
+
+        The snapshot is loaded with a single query and users without a cart get an empty one, so viewing the cart
+        never writes to the database. Anonymous users get a snapshot of their cookie cart.
 
         Args:
-            request: The HTTP request object.
-            args: Positional arguments passed to the method.
-            kwargs: Keyword arguments passed to the method.
+            **kwargs: Arbitrary keyword arguments.
 
         Returns:
-            A `TemplateResponse` object that renders the HTML template with the initialized cart.
+            dict[Hashable, Any]: The updated context.
         """
-        Cart.objects.get_or_create_by_user(request.user)
-        return super(CartConfirmView, self).get(request, *args, **kwargs)
+        context = super(CartConfirmView, self).get_context_data(**kwargs)
+        if self.request.user.is_authenticated:
+            cart = Cart.objects.snapshot_by_user(self.request.user)
+        else:
+            cart = CookieCart.from_request(self.request).snapshot()
+        recommendations = ItemNeighbour.objects.recommend([item.pk for item in cart.items])
+        return context | {
+            "cart": cart,
+            "price": get_promotion_engine().price(cart.items),
+            "recommendations": recommendations,
+        }
 
     def post(self, request: HttpRequest) -> HttpResponsePermanentRedirect:
-        """Process payment, create a new order, flush the cart, and send a notification to the user.
+        """Process payment, take the reserved items out of stock, create a new order with the promotion discount,
+           count it in the user's account summary, flush the cart, and send a notification to the user.
 
         Args:
             request: The HTTP request object.
 
         Returns:
-            A `HttpResponsePermanentRedirect` object that redirects the user to the purchase page.
+            A `HttpResponsePermanentRedirect` object that redirects the user to the purchase page, or back to the
+            cart confirmation page when an item is no longer in stock.
         """
         # Process payment should be added here.
 
-        # Create a new order.
-        order = Order.objects.create(user_profile=request.user)
-        order.items.set(request.user.cart.items.all())
+        with transaction.atomic():
+            cart_items = CartItem.objects.select_for_update().filter(cart__user_profile=request.user)
+            item_ids = list(cart_items.values_list("item_id", flat=True))
 
-        request.user.cart.items.set([])  # Flush the cart contents.
+            # Take the reserved units out of stock with a single conditional UPDATE.
+            if not Item.objects.commit(item_ids):
+                transaction.set_rollback(True)
+                messages.error(request, "Some items in your cart are no longer in stock.")
+                return redirect("shopping:cart-confirm")
+
+            # Create a new order, priced with the promotions in one pass over its items.
+            price = get_promotion_engine().price(Item.objects.filter(pk__in=item_ids))
+            order = Order.objects.create(
+                user_profile=request.user, subtotal=price.subtotal, discount=price.discount, total=price.total
+            )
+            order.items.set(item_ids)
+            AccountSummary.objects.record_order(request.user, price.total, order.created_at)
+            transaction.on_commit(lambda: record_recommendations(item_ids))
+
+            CartItem.objects.filter(cart__user_profile=request.user).delete()  # Flush the cart contents.
+            Cart.objects.filter(user_profile=request.user).update(updated_at=timezone.now())
+
+        # Send a notification. The channel layer is imported on first use, not by every process loading the views.
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+
+        import notifications.constants
 
-        # Send a notification.
         async_to_sync(get_channel_layer().group_send)(
             notifications.constants.NOTIFICATIONS_GROUP_NAME_PREFIX + request.user.username,
             {
@@ -164,7 +239,7 @@ class CartItemRemoveView(UserPassesTestMixin, View):
         Returns:
             HttpResponsePermanentRedirect: A redirect to the cart confirmation page.
         """
-        request.user.cart.items.remove(item_id)
+        request.user.cart.remove_item(item_id)
         return redirect("shopping:cart-confirm")
 
 
@@ -179,6 +254,10 @@ class OrderListView(ListView):
 
     Methods:
         get_queryset: Override the base method to filter orders by the user's profile.
+        get_context_data: Override the base method to add the catalog version keying the cached order rows.
+
+    The order count and lifetime spend come from the user's account summary, see
+    `shopping.context_processors.account_summary`.
 
     """
     model = Order
@@ -186,10 +265,105 @@ class OrderListView(ListView):
     template_name = "shopping/order_list.html"
 
     def get_queryset(self) -> QuerySet:
-        """Overrides the base method to filter orders by the user's profile.
+        """Overrides the base method to filter orders by the user's profile, read from the replica if any.
 
        Returns:
            A queryset of orders filtered by the user's profile.
 
        """
-        return Order.objects.filter(user_profile=self.request.user)
+        return Order.objects.using(get_replica_alias()).filter(user_profile=self.request.user)
+
+    def get_context_data(self, **kwargs) -> dict[Hashable, Any]:
+        """Overrides the base method to add the catalog version to the context.
+
+        Cached order rows are keyed on the catalog version since they show the current item names and prices.
+
+        Args:
+            **kwargs: Arbitrary keyword arguments.
+
+        Returns:
+            dict[Hashable, Any]: The updated context.
+        """
+        context = super(OrderListView, self).get_context_data(**kwargs)
+        return context | {"catalog_version": get_catalog_version()}
+
+
+@method_decorator(login_required, name='dispatch')
+class StaffBulkOperationView(UserPassesTestMixin, View, ABC):
+    """Base view of the staff JSON API running a bulk operation over carts or orders.
+
+    The request body is a JSON object handed to `run`. The response reports the number of changed rows, the number of
+    committed chunks and the duration of the operation.
+
+    Methods:
+        test_func: Tests if the user is a staff member.
+        post: Parses the request body, runs the operation and reports its counters.
+        run: Runs the operation, implemented by every subclass.
+
+    """
+    def test_func(self) -> Optional[bool]:
+        """Tests if the user is a staff member.
+
+        Returns:
+            bool: True if the user is a staff member, otherwise False.
+        """
+        return self.request.user.is_staff
+
+    def post(self, request: HttpRequest) -> JsonResponse:
+        """Parses the request body, runs the operation and reports its counters.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            JsonResponse: The counters of the operation, or an error with status 400 if the body is invalid.
+        """
+        try:
+            payload = json.loads(request.body)
+            if not isinstance(payload, dict):
+                raise ValueError(f"expected a JSON object, got {type(payload).__name__}")
+            result = self.run(payload)
+        except (ValueError, KeyError, TypeError) as error:
+            return JsonResponse({"error": f"Invalid request body: {error}"}, status=400)
+        return JsonResponse(result.as_dict())
+
+    @abstractmethod
+    def run(self, payload: dict[str, Any]) -> bulk_operations.BatchResult:
+        """Runs the operation.
+
+        Args:
+            payload: The parsed request body.
+
+        Returns:
+            The counters of the operation.
+
+        Raises:
+            ValueError, KeyError, TypeError: If the payload is invalid, answered with status 400.
+        """
+
+
+class StaffItemRecallView(StaffBulkOperationView):
+    """Removes a recalled item from every cart, the body being ``{"item_id": <id>}``."""
+    def run(self, payload: dict[str, Any]) -> bulk_operations.BatchResult:
+        return bulk_operations.recall_item(int(payload["item_id"]))
+
+
+class StaffOrderCancelView(StaffBulkOperationView):
+    """Cancels orders, the body being ``{"order_ids": [<id>, ...]}``."""
+    def run(self, payload: dict[str, Any]) -> bulk_operations.BatchResult:
+        order_ids = payload["order_ids"]
+        if not isinstance(order_ids, list):
+            raise ValueError(f"order_ids must be a list, got {type(order_ids).__name__}")
+        return bulk_operations.cancel_orders([int(order_id) for order_id in order_ids])
+
+
+class StaffItemRepriceView(StaffBulkOperationView):
+    """Reprices items in every open cart, the body being ``{"prices": {"<item id>": <price>, ...}}``."""
+    def run(self, payload: dict[str, Any]) -> bulk_operations.BatchResult:
+        prices = payload["prices"]
+        if not isinstance(prices, dict):
+            raise ValueError(f"prices must be an object, got {type(prices).__name__}")
+        prices = {int(item_id): int(price) for item_id, price in prices.items()}
+        if any(price < 0 for price in prices.values()):
+            raise ValueError("prices must not be negative")
+        return bulk_operations.reprice_items(prices)